@@ -1 +0,0 @@
-from app.api.main import api_router
\ No newline at end of file
@@ -1,18 +1,26 @@
 # app/api/dependencies.py
-from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import time
+from collections import namedtuple
+from dataclasses import dataclass
 from typing import Optional, Tuple, Union, Annotated
 from uuid import UUID
 from fastapi import Depends, HTTPException, Header, status
 from fastapi.security import OAuth2PasswordBearer
+from cachetools import LRUCache, TLRUCache, TTLCache
+import orjson
 from jose import JWTError, jwt
-from sqlmodel import Session, select, text
-from app.db.models import User, Patient, Clinician, UserRole
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import select
+from app.db.models import User, Patient, Clinician, UserRole, Session as SessionModel
 from app.db.database import get_session
-from app.services.auth_service import AuthService
+from app.utils.cache import get_redis
 from app.utils.settings import settings
 from app.utils.security import TokenData
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
 
 
 # OAuth2 scheme
@@ -21,11 +29,267 @@ oauth2_scheme = OAuth2PasswordBearer(
     scheme_name="JWT"
 )
 
+# Decoded token claims keyed by a digest of the raw token. An entry lives for
+# TOKEN_CACHE_TTL seconds at most and never past the token's own ``exp``.
+TOKEN_CACHE_TTL = 60
+
+
+TokenClaims = namedtuple("TokenClaims", "email role role_entity_id")
+
+# Case-insensitive like UserRole._missing_, without the enum call and
+# ValueError on bad input.
+_ROLE_BY_STR = {role.value: role for role in UserRole}
+
+
+def _token_expires_at(_key, claims, now):
+    exp = claims[3]
+    if exp is None:
+        return now + TOKEN_CACHE_TTL
+    return min(now + TOKEN_CACHE_TTL, exp)
+
+
+_token_cache = TLRUCache(maxsize=10_000, ttu=_token_expires_at, timer=time.time)
+
+# Built once so each decode only does the HMAC check and claim parsing.
+_JWT_KEY = settings.secret_key
+_JWT_ALGORITHMS = [settings.algorithm]
+_JWT_OPTIONS = {"verify_aud": False}
+
+
+def decode_access_token(token: str) -> TokenClaims:
+    """
+    Decode and verify a JWT, returning its ``TokenClaims``.
+
+    ``role_entity_id`` is the primary key of the caller's Clinician/Patient
+    row, or None for tokens issued before the claim existed.
+
+    Verified claims are cached so repeated requests with the same token skip
+    the signature check and JSON parsing.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    claims = _token_cache.get(key)
+    if claims is not None:
+        return TokenClaims(claims[0], claims[1], claims[2])
+
+    payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_OPTIONS)
+    email: str = payload.get("sub")
+    user_role_str: str = payload.get("user_role")
+    if email is None or user_role_str is None:
+        raise JWTError("Missing required claims")
+    user_role = _ROLE_BY_STR.get(str(user_role_str).lower())
+    if user_role is None:
+        raise JWTError("Unknown user role")
+    role_entity_id = payload.get("role_entity_id")
+    if role_entity_id is not None:
+        role_entity_id = UUID(role_entity_id)
+
+    _token_cache[key] = (email, user_role, role_entity_id, payload.get("exp"))
+    return TokenClaims(email, user_role, role_entity_id)
+
+
+# The columns auth actually needs. Endpoints that want the full row load it
+# with ``session.get(User, user.user_id)``.
+AuthUser = namedtuple("AuthUser", "user_id is_active role")
+
+
+# After a Redis failure the shared layer is skipped for this many seconds,
+# so an outage costs one timeout per process rather than one per lookup.
+SHARED_CACHE_RETRY_AFTER = 10.0
+_shared_retry_at = 0.0
+
+
+def _shared_available() -> bool:
+    return time.monotonic() >= _shared_retry_at
+
+
+def _shared_failed() -> None:
+    global _shared_retry_at
+    _shared_retry_at = time.monotonic() + SHARED_CACHE_RETRY_AFTER
+
+
+async def _shared_get(key: str) -> Optional[str]:
+    # Redis is an optimisation here, never a requirement: on any Redis
+    # failure auth falls back to the database.
+    if not _shared_available():
+        return None
+    try:
+        cache = await get_redis()
+        return await cache.get(key)
+    except (RedisError, OSError):
+        _shared_failed()
+        return None
+
+
+async def _shared_set(key: str, value: Union[str, bytes], ex: Optional[int] = None) -> None:
+    if not _shared_available():
+        return
+    try:
+        cache = await get_redis()
+        await cache.set(key, value, ex=ex)
+    except (RedisError, OSError):
+        _shared_failed()
+
+
+async def _shared_delete(key: str) -> None:
+    # Deletes are still attempted while the breaker is open: a missed
+    # invalidation would outlive the outage, a wasted timeout would not.
+    try:
+        cache = await get_redis()
+        await cache.delete(key)
+    except (RedisError, OSError):
+        _shared_failed()
+
+
+class UserCache:
+    """
+    Cache of active users keyed by email.
+
+    A short-lived in-process TTLCache sits in front of Redis, which is shared
+    by every worker. Call ``invalidate`` whenever a user row is written so
+    stale data is dropped before the TTL runs out.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: int = 30):
+        self._users = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._ttl = ttl
+
+    @staticmethod
+    def _key(email: str) -> str:
+        return f"auth:user:{email}"
+
+    async def get(self, email: str) -> Optional[AuthUser]:
+        user = self._users.get(email)
+        if user is not None:
+            return user
+
+        raw = await _shared_get(self._key(email))
+        if raw is None:
+            return None
+        user_id, is_active, role = orjson.loads(raw)
+        user = AuthUser(UUID(user_id), is_active, role)
+        self._users[email] = user
+        return user
+
+    async def set(self, email: str, user: AuthUser) -> None:
+        self._users[email] = user
+        # orjson serialises the UUID natively and is several times faster
+        # than the json-based helpers in app.utils.cache for payloads this
+        # small. It rejects namedtuples, hence the plain tuple.
+        await _shared_set(self._key(email), orjson.dumps(tuple(user)), ex=self._ttl)
+
+    async def invalidate(self, email: str) -> None:
+        self._users.pop(email, None)
+        await _shared_delete(self._key(email))
+
+
+user_cache = UserCache()
+
+# User columns AuthUser is built from (plus the email it is keyed by).
+# Changing any of them through the ORM drops the cached entry on commit, so
+# a deactivated or re-roled user loses access without waiting out the TTL.
+_AUTH_USER_FIELDS = ("email", "is_active", "role")
+# Keeps the scheduled Redis deletes referenced until they finish.
+_pending_invalidations = set()
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _collect_stale_users(session, flush_context) -> None:
+    stale = session.info.setdefault("stale_user_emails", set())
+    for user in session.deleted:
+        if isinstance(user, User):
+            stale.add(user.email)
+    for user in session.dirty:
+        if not isinstance(user, User):
+            continue
+        attrs = inspect(user).attrs
+        if any(attrs[field].history.has_changes() for field in _AUTH_USER_FIELDS):
+            stale.add(user.email)
+            # The entry is keyed by the old address when the email changed.
+            stale.update(attrs.email.history.deleted)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_stale_users(session) -> None:
+    for email in session.info.pop("stale_user_emails", ()):
+        task = asyncio.get_running_loop().create_task(user_cache.invalidate(email))
+        _pending_invalidations.add(task)
+        task.add_done_callback(_pending_invalidations.discard)
+
 
-def get_auth_role(user_role: UserRole = Header()) -> UserRole:
+@event.listens_for(OrmSession, "after_rollback")
+def _drop_stale_users(session) -> None:
+    session.info.pop("stale_user_emails", None)
+
+# Owner of each therapy session, keyed by the raw session UUID bytes and
+# mirrored to Redis under ``auth:sess:<session_id>``. Ownership never changes
+# once a session is created, so entries only need evicting when the session
+# is deleted.
+_session_owner_cache = LRUCache(maxsize=50_000)
+
+
+async def get_session_owner(session_id: UUID) -> Optional[UUID]:
+    """Return the cached owner of a session, or None if it isn't cached."""
+    owner_id = _session_owner_cache.get(session_id.bytes)
+    if owner_id is None:
+        raw = await _shared_get(f"auth:sess:{session_id}")
+        if raw is not None:
+            owner_id = UUID(raw)
+            await remember_session_owner(session_id, owner_id)
+    return owner_id
+
+
+async def remember_session_owner(session_id: UUID, owner_id: UUID) -> None:
+    _session_owner_cache[session_id.bytes] = owner_id
+    await _shared_set(f"auth:sess:{session_id}", str(owner_id))
+
+
+async def forget_session_owner(session_id: UUID) -> None:
+    """Drop a cached session owner; call this when a session is deleted."""
+    _session_owner_cache.pop(session_id.bytes, None)
+    await _shared_delete(f"auth:sess:{session_id}")
+
+
+# Patient user ids assigned to each clinician, keyed by the clinician's raw
+# user id bytes and mirrored to Redis under ``auth:clin:<clinician_id>``.
+# Assignments only change when a patient accepts an invitation, which calls
+# ``forget_clinician_patients``; the short in-process TTL bounds how long
+# other workers can lag behind that, and Redis lets a worker whose entry has
+# expired refill it without a query.
+_clinician_patients_cache = TTLCache(maxsize=1024, ttl=15)
+CLINICIAN_PATIENTS_TTL = 300
+
+
+async def get_clinician_patient_ids(clinician_id: UUID, session: AsyncSession) -> frozenset:
+    """Return the user ids of the patients assigned to a clinician."""
+    patient_ids = _clinician_patients_cache.get(clinician_id.bytes)
+    if patient_ids is not None:
+        return patient_ids
+
+    raw = await _shared_get(f"auth:clin:{clinician_id}")
+    if raw is not None:
+        patient_ids = frozenset(UUID(patient_id) for patient_id in orjson.loads(raw))
+    else:
+        result = await session.execute(
+            select(Patient.user_id).where(Patient.clinician_id == clinician_id)
+        )
+        patient_ids = frozenset(result.scalars().all())
+        await _shared_set(
+            f"auth:clin:{clinician_id}", orjson.dumps(list(patient_ids)), ex=CLINICIAN_PATIENTS_TTL
+        )
+    _clinician_patients_cache[clinician_id.bytes] = patient_ids
+    return patient_ids
+
+
+async def forget_clinician_patients(clinician_id: UUID) -> None:
+    """Drop a clinician's cached patient list; call this on (re)assignment."""
+    _clinician_patients_cache.pop(clinician_id.bytes, None)
+    await _shared_delete(f"auth:clin:{clinician_id}")
+
+
+async def get_auth_role(user_role: UserRole = Header()) -> UserRole:
   return user_role
 
-def admin_permissions(user_role: UserRole = Depends(get_auth_role)) :
+async def admin_permissions(user_role: UserRole = Depends(get_auth_role)) :
     if user_role != UserRole.ADMIN: 
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -33,79 +297,134 @@ def admin_permissions(user_role: UserRole = Depends(get_auth_role)) :
         )
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
+@dataclass(slots=True)
+class Principal:
+    """
+    The authenticated caller, resolved by ``load_principal``.
+
+    ``clinician_id``/``patient_id`` hold the primary key of the caller's
+    role-specific row, so role and ownership checks need no extra queries.
+    Unpacks as ``user, role`` for handlers written against the old tuple.
+    """
+    user: AuthUser
+    role: UserRole
+    clinician_id: Optional[UUID] = None
+    patient_id: Optional[UUID] = None
+
+    def __iter__(self):
+        yield self.user
+        yield self.role
+
+
+async def get_auth_claims(
+    token: Annotated[str, Depends(oauth2_scheme)]
+) -> TokenClaims:
+    """
+    Verify the bearer token and return its claims without touching the
+    database. Enough for checks that depend only on the caller's role.
+    """
+    try:
+        return decode_access_token(token)
+    except (JWTError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def load_principal(claims: TokenClaims, session: AsyncSession) -> Principal:
+    """
+    Resolve verified token claims into a Principal, consulting the user
+    cache before the database.
+    """
+    token_data = TokenData(email=claims.email, user_role=claims.role)
+
+    user = await user_cache.get(token_data.email)
+    if user is None:
+        result = await session.execute(
+            select(User.user_id, User.is_active, User.role).where(User.email == token_data.email)
+        )
+        row = result.one_or_none()
+        if row is None or not row.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user = AuthUser(*row)
+        await user_cache.set(token_data.email, user)
+
+    # Tokens issued before role_entity_id existed fall back to the user id,
+    # which is also the Clinician/Patient primary key.
+    entity_id = claims.role_entity_id or user.user_id
+    return Principal(
+        user=user,
+        role=token_data.user_role,
+        clinician_id=entity_id if token_data.user_role == UserRole.DOCTOR else None,
+        patient_id=entity_id if token_data.user_role == UserRole.PATIENT else None,
+    )
+
+
+async def get_principal(
+    claims: TokenClaims = Depends(get_auth_claims),
     session: AsyncSession = Depends(get_session)
-) -> Tuple[Union[User, Patient, Clinician], UserRole]:
+) -> Principal:
     """
     Get the current authenticated user from the JWT token.
+
+    Role-only checks should depend on ``get_auth_claims`` instead; this
+    dependency may hit the database.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        email: str = payload.get("sub")
-        user_role_str: str = payload.get("user_role")
-        if email is None or user_role_str is None:
-            raise credentials_exception
-        user_role = UserRole(user_role_str)
-        token_data = TokenData(email=email, user_role=user_role)
-    except JWTError:
-        raise credentials_exception
-
-    result = await session.execute(select(User).where(User.email == token_data.email))
-    user = result.scalar_one_or_none()
-    if user is None or not user.is_active:
-        raise credentials_exception
-    return user, token_data.user_role
+    return await load_principal(claims, session)
+
+
+# Kept as the same callable so FastAPI's per-request dependency cache treats
+# both names as one dependency.
+get_current_user = get_principal
 
 
 async def get_current_active_user(
-    current_user: Annotated[Tuple[Union[User, Patient, Clinician], UserRole], Depends(get_current_user)]
-) -> Tuple[Union[User, Patient, Clinician], UserRole]:
+    principal: Principal = Depends(get_principal)
+) -> Principal:
     """
     Verify that the current user is active.
     """
-    user, role = current_user
-    if not user.is_active:
+    if not principal.user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="This account is inactive"
         )
-    return user, role
+    return principal
 
 async def get_current_admin(
-    current_user: Annotated[Tuple[User, UserRole], Depends(get_current_user)]
-) -> User:
+    claims: TokenClaims = Depends(get_auth_claims),
+    session: AsyncSession = Depends(get_session)
+) -> AuthUser:
     """
     Verify that the current user is an admin.
     """
-    user, role = current_user
-    if role != UserRole.ADMIN:
+    if claims.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required"
         )
-    return user
+    principal = await load_principal(claims, session)
+    return principal.user
 
 async def get_current_clinician(
-    current_user: Annotated[Tuple[Clinician, UserRole], Depends(get_current_user)],
+    principal: Principal = Depends(get_principal),
     session: AsyncSession = Depends(get_session),
 ) -> Clinician:
     """
     Verify that the current user is a clinician.
     """
-    user, role = current_user
-    if role != UserRole.DOCTOR:
+    if principal.role != UserRole.DOCTOR:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Clinician privileges required"
         )
-    result = await session.execute(select(Clinician).where(Clinician.user_id == user.user_id))
-    clinician = result.scalar_one_or_none()
+    clinician = await session.get(Clinician, principal.clinician_id)
 
     if not clinician:
         raise HTTPException(
@@ -115,22 +434,54 @@ async def get_current_clinician(
 
     return clinician
 
+async def get_current_clinician_with_user(
+    claims: TokenClaims = Depends(get_auth_claims),
+    session: AsyncSession = Depends(get_session),
+) -> Tuple[User, Clinician]:
+    """
+    Verify that the current user is a clinician and return the full User and
+    Clinician rows, fetched together in a single joined query.
+    """
+    if claims.role != UserRole.DOCTOR:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Clinician privileges required"
+        )
+    result = await session.execute(
+        select(User, Clinician)
+        .join(Clinician, Clinician.user_id == User.user_id)
+        .where(User.email == claims.email)
+    )
+    row = result.one_or_none()
+
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Clinician not found",
+        )
+    user, clinician = row
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return user, clinician
+
 async def get_current_patient(
-    current_user: Annotated[Tuple[UserRole, UserRole], Depends(get_current_user)],
+    principal: Principal = Depends(get_principal),
     session: AsyncSession = Depends(get_session),
 ) -> Patient:
     """
     Verify that the current user is a patient and return the Patient object.
     """
-    user, role = current_user
-
-    if role != UserRole.PATIENT:
+    if principal.role != UserRole.PATIENT:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Patient privileges required",
         )
-    result = await session.exec(select(Patient).where(Patient.user_id == user.user_id))
-    patient = result.first()
+    patient = await session.get(Patient, principal.patient_id)
 
     if not patient:
         raise HTTPException(
@@ -142,8 +493,8 @@ async def get_current_patient(
 
 async def get_current_user_safe(
     token: Optional[str] = Depends(oauth2_scheme),
-    session: Session = Depends(get_session)
-) -> Optional[Tuple[Union[User, Patient, Clinician], UserRole]]:
+    session: AsyncSession = Depends(get_session)
+) -> Optional[Principal]:
     """
     A safe version of get_current_user that returns None instead of raising exceptions.
     Useful for endpoints that can work with both authenticated and unauthenticated users.
@@ -152,77 +503,136 @@ async def get_current_user_safe(
         return None
         
     try:
-        return await get_current_user(token, session)
-    except HTTPException:
+        return await load_principal(decode_access_token(token), session)
+    except (JWTError, ValueError, HTTPException):
         return None
 
 async def authorize_user_resource(
     user_id: UUID,
-    current_user: Tuple[User, UserRole] = Depends(get_current_user)
+    claims: TokenClaims = Depends(get_auth_claims),
+    session: AsyncSession = Depends(get_session)
 ) -> None:
     """
     Authorize access to a user resource.
+
+    Doctors and admins are let through on their token claims alone, with
+    no user lookup, so deactivating one of them only takes effect here
+    when the token expires.
     
     Args:
         user_id: ID of the user resource being accessed
-        current_user: Current authenticated user
+        claims: Verified claims of the current token
+        session: Database session, used only for ownership checks
         
     Raises:
         HTTPException: If user is not authorized to access the resource
     """
-    user, role = current_user
-    if role != UserRole.DOCTOR and role != UserRole.ADMIN and str(user.user_id) != str(user_id):
+    # Doctors and admins can access any user
+    if claims.role in (UserRole.DOCTOR, UserRole.ADMIN):
+        return
+
+    user, _ = await load_principal(claims, session)
+    if user.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this resource")
 
 async def authorize_session_resource(
     session_id: UUID,
-    current_user: Tuple[User, UserRole] = Depends(get_current_user),
+    claims: TokenClaims = Depends(get_auth_claims),
     db: AsyncSession = Depends(get_session)
 ) -> None:
     """
     Authorize access to a session resource.
+
+    Doctors and admins are let through on their token claims alone, with
+    no user lookup, so deactivating one of them only takes effect here
+    when the token expires.
     
     Args:
         session_id: ID of the session resource being accessed
-        current_user: Current authenticated user
+        claims: Verified claims of the current token
         db: Database session
         
     Raises:
         HTTPException: If user is not authorized to access the resource
     """
-    user, role = current_user
-    
     # Doctors and admins can access any session
-    if role == UserRole.DOCTOR or role == UserRole.ADMIN:
+    if claims.role in (UserRole.DOCTOR, UserRole.ADMIN):
         return
+
+    user, _ = await load_principal(claims, db)
     
     # For other users, check if the session belongs to them
-    query = "SELECT user_id FROM sessions WHERE session_id = :session_id"
-    result = await db.execute(text(query), {"session_id": str(session_id)})
-    session_data = result.first()
-    
-    if not session_data:
-        raise HTTPException(status_code=404, detail="Session not found")
+    owner_id = await get_session_owner(session_id)
+    if owner_id is None:
+        result = await db.execute(
+            select(SessionModel.user_id).where(SessionModel.session_id == session_id)
+        )
+        owner_id = result.scalar_one_or_none()
+
+        if owner_id is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        await remember_session_owner(session_id, owner_id)
     
-    if str(user.user_id) != str(session_data.user_id):
+    if user.user_id != owner_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this session")
 
+async def authorize_patient_data(
+    user_id: UUID,
+    principal: Principal = Depends(get_principal),
+    session: AsyncSession = Depends(get_session)
+) -> None:
+    """
+    Authorize access to a patient's sessions and game results.
+
+    Patients may only read their own data and clinicians only that of their
+    assigned patients; other roles are let through.
+
+    Args:
+        user_id: ID of the patient whose data is being accessed
+        principal: The authenticated caller
+        session: Database session, used only on a clinician-cache miss
+
+    Raises:
+        HTTPException: If user is not authorized to access the data
+    """
+    if principal.role == UserRole.PATIENT:
+        allowed = principal.user.user_id == user_id
+    elif principal.role == UserRole.DOCTOR:
+        allowed = user_id in await get_clinician_patient_ids(principal.clinician_id, session)
+    else:
+        allowed = True
+
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this data"
+        )
+
 async def authorize_cache_invalidation(
     user_id: UUID,
-    current_user: Tuple[User, UserRole] = Depends(get_current_user)
+    claims: TokenClaims = Depends(get_auth_claims),
+    session: AsyncSession = Depends(get_session)
 ) -> None:
     """
     Authorize cache invalidation for a user.
+
+    Doctors and admins are let through on their token claims alone, with
+    no user lookup, so deactivating one of them only takes effect here
+    when the token expires.
     
     Args:
         user_id: ID of the user whose cache is being invalidated
-        current_user: Current authenticated user
+        claims: Verified claims of the current token
+        session: Database session, used only for ownership checks
         
     Raises:
         HTTPException: If user is not authorized to invalidate the cache
     """
-    user, role = current_user
-    if role != UserRole.DOCTOR and role != UserRole.ADMIN and str(user.user_id) != str(user_id):
+    if claims.role in (UserRole.DOCTOR, UserRole.ADMIN):
+        return
+
+    user, _ = await load_principal(claims, session)
+    if user.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to invalidate cache")
 
 
@@ -1,9 +0,0 @@
-from app.api.routes.auth import *
-from app.api.routes.session import *
-from app.api.routes.mini_games import *
-from app.api.routes.game_results import *
-from app.api.routes.analytics import *
-
-
-
-
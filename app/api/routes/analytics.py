@@ -1,87 +1,209 @@
 # cognitive_api.py
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import Tuple, text, select
-from typing import List, Optional, Dict, Any
+from sqlalchemy import TIMESTAMP, String, Tuple, bindparam, cast, text, select
+from sqlalchemy.dialects.postgresql import INTERVAL, JSONB, UUID as PG_UUID
+from types import MappingProxyType
+from typing import List, Literal, Mapping, Optional, Dict, Any
 from datetime import datetime, timedelta
 from uuid import UUID
 from sqlmodel import func
-from app.api.dependinces import get_current_user
+from app.api.dependinces import get_current_admin, get_current_user
 from app.db.database import get_session
-from app.services.cognitive_assessment_service import CognitiveAssessmentService
+from app.services.cognitive_assessment_service import CognitiveAssessmentService, clear_normative_cache
 from app.db.models import (
     MemoryAnalysis, ImpulseAnalysis, ExecutiveFunctionAnalysis, 
     AttentionAnalysis, NormativeData, Session, Patient, User, UserRole
 )
-from app.utils.age_utils import get_age_group
+from app.db.enums import CognitiveDomain
+from app.utils.age_utils import AGE_GROUP_FUNCTION
+from app.utils.stats_utils import z_to_percentile
+from app.utils.time_scale_utils import DAILY_SCORE_VIEWS, SESSION_SCORES_VIEW, daily_score_views_ready
 
-router = APIRouter(prefix="/api/cognitive", tags=["cognitive"])
+# orjson encodes the UUIDs, datetimes and floats these handlers return
+# natively and much faster than the stdlib json encoder.
+router = APIRouter(prefix="/api/cognitive", tags=["cognitive"], default_response_class=ORJSONResponse)
 
-DOMAIN_CONFIG = {
+# Query values FastAPI validates before a handler runs, so only these
+# intervals ever reach the database.
+TimeseriesInterval = Literal["1 hour", "1 day", "1 week", "1 month"]
+ProgressPeriod = Literal["30d", "60d", "90d"]
+PROGRESS_PERIODS: Mapping[str, str] = MappingProxyType({
+    "30d": "30 days",
+    "60d": "60 days",
+    "90d": "90 days",
+})
+
+DOMAIN_CONFIG: Mapping[str, Dict[str, Any]] = MappingProxyType({
     "memory": {
         "model": MemoryAnalysis,
+        "columns": (
+            MemoryAnalysis.overall_memory_score, MemoryAnalysis.percentile,
+            MemoryAnalysis.classification, MemoryAnalysis.working_memory_score,
+            MemoryAnalysis.working_memory_components, MemoryAnalysis.visual_memory_score,
+            MemoryAnalysis.visual_memory_components, MemoryAnalysis.data_completeness,
+            MemoryAnalysis.tasks_used,
+        ),
         "build_response": lambda obj: {
-            "overall_score": float(obj.overall_memory_score),
-            "percentile": float(obj.percentile),
+            "overall_score": obj.overall_memory_score,
+            "percentile": obj.percentile,
             "classification": obj.classification,
             "components": {
                 "working_memory": {
-                    "score": float(obj.working_memory_score),
+                    "score": obj.working_memory_score,
                     "components": obj.working_memory_components
                 },
                 "visual_memory": {
-                    "score": float(obj.visual_memory_score),
+                    "score": obj.visual_memory_score,
                     "components": obj.visual_memory_components
                 }
             },
-            "data_completeness": float(obj.data_completeness),
+            "data_completeness": obj.data_completeness,
             "tasks_used": obj.tasks_used
         }
     },
     "impulse_control": {
         "model": ImpulseAnalysis,
+        "columns": (
+            ImpulseAnalysis.overall_impulse_control_score, ImpulseAnalysis.percentile,
+            ImpulseAnalysis.classification, ImpulseAnalysis.inhibitory_control,
+            ImpulseAnalysis.response_control, ImpulseAnalysis.decision_speed,
+            ImpulseAnalysis.error_adaptation, ImpulseAnalysis.data_completeness,
+            ImpulseAnalysis.games_used,
+        ),
         "build_response": lambda obj: {
-            "overall_score": float(obj.overall_impulse_control_score),
-            "percentile": float(obj.percentile),
+            "overall_score": obj.overall_impulse_control_score,
+            "percentile": obj.percentile,
             "classification": obj.classification,
             "components": {
-                "inhibitory_control": float(obj.inhibitory_control),
-                "response_control": float(obj.response_control),
-                "decision_speed": float(obj.decision_speed),
-                "error_adaptation": float(obj.error_adaptation)
+                "inhibitory_control": obj.inhibitory_control,
+                "response_control": obj.response_control,
+                "decision_speed": obj.decision_speed,
+                "error_adaptation": obj.error_adaptation
             },
-            "data_completeness": float(obj.data_completeness),
+            "data_completeness": obj.data_completeness,
             "games_used": obj.games_used
         }
     },
     "attention": {
         "model": AttentionAnalysis,
+        "columns": (
+            AttentionAnalysis.overall_score, AttentionAnalysis.percentile,
+            AttentionAnalysis.classification, AttentionAnalysis.go_nogo_score,
+            AttentionAnalysis.sequence_score,
+        ),
         "build_response": lambda obj: {
-            "overall_score": float(obj.overall_score),
-            "percentile": float(obj.percentile),
+            "overall_score": obj.overall_score,
+            "percentile": obj.percentile,
             "classification": obj.classification,
             "components": {
-                "crop_score": float(obj.crop_score),
-                "sequence_score": float(obj.sequence_score)
+                "go_nogo_score": obj.go_nogo_score,
+                "sequence_score": obj.sequence_score
             }
         }
     },
     "executive_function": {
         "model": ExecutiveFunctionAnalysis,
+        "columns": (
+            ExecutiveFunctionAnalysis.executive_function_score, ExecutiveFunctionAnalysis.percentile,
+            ExecutiveFunctionAnalysis.classification, ExecutiveFunctionAnalysis.memory_contribution,
+            ExecutiveFunctionAnalysis.impulse_contribution, ExecutiveFunctionAnalysis.attention_contribution,
+            ExecutiveFunctionAnalysis.profile_pattern,
+        ),
         "build_response": lambda obj: {
-            "overall_score": float(obj.executive_function_score),
-            "percentile": float(obj.percentile),
+            "overall_score": obj.executive_function_score,
+            "percentile": obj.percentile,
             "classification": obj.classification,
             "components": {
-                "memory_contribution": float(obj.memory_contribution),
-                "impulse_contribution": float(obj.impulse_contribution),
-                "attention_contribution": float(obj.attention_contribution)
+                "memory_contribution": obj.memory_contribution,
+                "impulse_contribution": obj.impulse_contribution,
+                "attention_contribution": obj.attention_contribution
             },
             "profile_pattern": obj.profile_pattern
         }
     }
-}
+})
+
+# Typed binds for the raw SQL below, so UUIDs and timestamps go to asyncpg
+# as native values instead of being stringified first.
+_USER_ID_PARAM = bindparam("user_id", type_=PG_UUID(as_uuid=True))
+_START_DATE_PARAM = bindparam("start_date", type_=TIMESTAMP(timezone=True))
+_END_DATE_PARAM = bindparam("end_date", type_=TIMESTAMP(timezone=True))
+# The interval goes over as text and Postgres casts it: an untyped bind in
+# CAST(:interval AS interval) is typed interval, and asyncpg then insists
+# on a timedelta, which can't express "1 month" anyway.
+_INTERVAL_PARAM = bindparam("interval", type_=String)
+
+# The whole profile as one JSONB document: patient details, session stats,
+# per-domain averages and the trend graph from cognitive_session_overall.
+# Each average is its own subquery so a session with several analyses in
+# one domain can't skew the others the way a fan-out join would.
+PROFILE_QUERY = text(f"""
+    SELECT jsonb_build_object(
+        'user_id', p.user_id,
+        'user_name', concat(p.first_name, ' ', p.last_name),
+        'age', EXTRACT(YEAR FROM age(current_date, p.date_of_birth))::int,
+        'age_group', {AGE_GROUP_FUNCTION}(EXTRACT(YEAR FROM age(current_date, p.date_of_birth))::int),
+        'gender', p.gender,
+        'adhd_subtype', p.adhd_subtype,
+        'total_sessions', stats.total_sessions,
+        'first_session_date', stats.first_session_date,
+        'last_session_date', stats.last_session_date,
+        'avg_domain_scores', jsonb_build_object(
+            'memory', COALESCE((
+                SELECT AVG(ma.overall_memory_score)
+                FROM memory_analysis ma JOIN sessions s ON s.session_id = ma.session_id
+                WHERE s.user_id = p.user_id
+            ), 0),
+            'attention', COALESCE((
+                SELECT AVG(aa.overall_score)
+                FROM attention_analysis aa JOIN sessions s ON s.session_id = aa.session_id
+                WHERE s.user_id = p.user_id
+            ), 0),
+            'impulse_control', COALESCE((
+                SELECT AVG(ia.overall_impulse_control_score)
+                FROM impulse_analysis ia JOIN sessions s ON s.session_id = ia.session_id
+                WHERE s.user_id = p.user_id
+            ), 0),
+            'executive_function', COALESCE((
+                SELECT AVG(ea.executive_function_score)
+                FROM executive_function_analysis ea JOIN sessions s ON s.session_id = ea.session_id
+                WHERE s.user_id = p.user_id
+            ), 0)
+        ),
+        'trend_graph', COALESCE(trend.points, '[]'::jsonb)
+    ) AS profile
+    FROM patients p
+    CROSS JOIN LATERAL (
+        SELECT
+            COUNT(*) AS total_sessions,
+            MIN(session_date) AS first_session_date,
+            MAX(session_date) AS last_session_date
+        FROM sessions
+        WHERE user_id = p.user_id
+    ) stats
+    CROSS JOIN LATERAL (
+        SELECT jsonb_agg(
+            jsonb_build_object(
+                'session_id', v.session_id,
+                'session_date', v.session_date,
+                'attention_score', v.attention_score,
+                'memory_score', v.memory_score,
+                'impulse_score', v.impulse_score,
+                'executive_score', v.executive_score,
+                'overall_score', ROUND(v.overall_score::numeric, 2)
+            )
+            ORDER BY v.session_date ASC
+        ) AS points
+        FROM {SESSION_SCORES_VIEW} v
+        WHERE v.user_id = p.user_id
+    ) trend
+    WHERE p.user_id = :user_id
+""").bindparams(_USER_ID_PARAM).columns(profile=JSONB)
 
 @router.get("/profile/{user_id}")
 async def get_cognitive_profile(
@@ -92,118 +214,164 @@ async def get_cognitive_profile(
     """
     Get comprehensive cognitive profile for a user, including trend graph data.
     """
-    patient_result = await db.execute(
-        select(Patient).where(Patient.user_id == user_id)
-    )
-    patient = patient_result.scalar_one_or_none()
-    if not patient:
+    result = await db.execute(PROFILE_QUERY, {"user_id": user_id})
+    profile = result.scalar_one_or_none()
+    if profile is None:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    avg_memory_score = await db.execute(
-        select(func.avg(MemoryAnalysis.overall_memory_score))
-        .join(Session, MemoryAnalysis.session_id == Session.session_id)
-        .where(Session.user_id == user_id)
-    )
-    avg_memory_score = avg_memory_score.scalar_one_or_none() or 0.0
+    return profile
 
-    avg_attention_score = await db.execute(
-        select(func.avg(AttentionAnalysis.overall_score))
-        .join(Session, AttentionAnalysis.session_id == Session.session_id)
-        .where(Session.user_id == user_id)
-    )
-    avg_attention_score = avg_attention_score.scalar_one_or_none() or 0.0
+# Score table/column per domain. Only these allowlisted names are ever
+# interpolated into SQL; the statements below are built once at import so
+# each domain always sends identical text and asyncpg reuses its prepared
+# statement.
+DOMAIN_TABLES: Mapping[CognitiveDomain, tuple[str, str]] = MappingProxyType({
+    CognitiveDomain.attention: ("attention_analysis", "overall_score"),
+    CognitiveDomain.memory: ("memory_analysis", "overall_memory_score"),
+    CognitiveDomain.impulse_control: ("impulse_analysis", "overall_impulse_control_score"),
+    CognitiveDomain.executive_function: ("executive_function_analysis", "executive_function_score"),
+})
 
-    avg_impulse_score = await db.execute(
-        select(func.avg(ImpulseAnalysis.overall_impulse_control_score))
-        .join(Session, ImpulseAnalysis.session_id == Session.session_id)
-        .where(Session.user_id == user_id)
-    )
-    avg_impulse_score = avg_impulse_score.scalar_one_or_none() or 0.0
+# Score column per domain, for the statements built with the ORM below.
+DOMAIN_SCORE_COLUMNS = MappingProxyType({
+    CognitiveDomain.attention: AttentionAnalysis.overall_score,
+    CognitiveDomain.memory: MemoryAnalysis.overall_memory_score,
+    CognitiveDomain.impulse_control: ImpulseAnalysis.overall_impulse_control_score,
+    CognitiveDomain.executive_function: ExecutiveFunctionAnalysis.executive_function_score,
+})
 
-    avg_executive_score = await db.execute(
-        select(func.avg(ExecutiveFunctionAnalysis.executive_function_score))
-        .join(Session, ExecutiveFunctionAnalysis.session_id == Session.session_id)
-        .where(Session.user_id == user_id)
-    )
-    avg_executive_score = avg_executive_score.scalar_one_or_none() or 0.0
 
-    trend_query = text("""
-        SELECT 
-            s.session_id AS session_id,
-            s.session_date AS session_date,
-            COALESCE(ma.overall_memory_score, 0) AS memory_score,
-            COALESCE(aa.overall_score, 0) AS attention_score,
-            COALESCE(ia.overall_impulse_control_score, 0) AS impulse_score,
-            COALESCE(ea.executive_function_score, 0) AS executive_score
-        FROM sessions s
-        LEFT JOIN memory_analysis ma ON s.session_id = ma.session_id
-        LEFT JOIN attention_analysis aa ON s.session_id = aa.session_id
-        LEFT JOIN impulse_analysis ia ON s.session_id = ia.session_id
-        LEFT JOIN executive_function_analysis ea ON s.session_id = ea.session_id
-        WHERE s.user_id = :user_id
-        ORDER BY s.session_date ASC
-    """)
-    trend_result = await db.execute(trend_query, {"user_id": str(user_id)})
-    trend_data = trend_result.fetchall()
+def _timeseries_statement(score):
+    analysis = score.class_
+    return (
+        select(
+            func.time_bucket(cast(_INTERVAL_PARAM, INTERVAL), analysis.created_at).label("time_bucket"),
+            func.avg(score).label("avg_score"),
+        )
+        .join(Session, Session.session_id == analysis.session_id)
+        .where(
+            Session.user_id == _USER_ID_PARAM,
+            analysis.created_at.between(_START_DATE_PARAM, _END_DATE_PARAM),
+        )
+        .group_by("time_bucket")
+        .order_by("time_bucket")
+    )
 
-   
 
-    trend_graph = [
-        {
-            "session_id": str(row.session_id),
-            "session_date": row.session_date,
-            "attention_score": float(row.attention_score),
-            "memory_score": float(row.memory_score),
-            "impulse_score": float(row.impulse_score),
-            "executive_score": float(row.executive_score),
-        }
-        for row in trend_data
-    ]
+TIMESERIES_SQL = {
+    domain: _timeseries_statement(score)
+    for domain, score in DOMAIN_SCORE_COLUMNS.items()
+}
 
-    today = datetime.utcnow().date()
-    age = (
-        today.year
-        - patient.date_of_birth.year
-        - ((today.month, today.day) < (patient.date_of_birth.month, patient.date_of_birth.day))
-    )
-    age_group = get_age_group(age)
+# Day-or-coarser buckets re-bucket the daily continuous aggregates, so long
+# ranges read one row per active day rather than every analysis row.
+DAILY_TIMESERIES_SQL = {
+    domain: text(f"""
+        SELECT 
+            time_bucket(CAST(:interval AS interval), d.bucket) AS time_bucket,
+            SUM(d.score_sum) / NULLIF(SUM(d.score_count), 0) AS avg_score
+        FROM 
+            {DAILY_SCORE_VIEWS[domain.value]} d
+        WHERE 
+            d.user_id = :user_id
+            AND d.bucket BETWEEN time_bucket(INTERVAL '1 day', :start_date) AND :end_date
+        GROUP BY 
+            1
+        ORDER BY 
+            1 ASC
+    """).bindparams(_USER_ID_PARAM, _INTERVAL_PARAM, _START_DATE_PARAM, _END_DATE_PARAM)
+    for domain in DOMAIN_TABLES
+}
 
-    session_stats = await db.execute(
-        select(
-            func.count(Session.session_id).label("total_sessions"),
-            func.min(Session.session_date).label("first_session_date"),
-            func.max(Session.session_date).label("last_session_date")
-        ).where(Session.user_id == user_id)
-    )
-    stats = session_stats.first()
-    profile = {
-        "user_id": user_id,
-        "user_name": f"{patient.first_name} {patient.last_name}",
-        "age": age,
-        "age_group": age_group,
-        "gender": patient.gender,
-        "total_sessions": stats.total_sessions if stats else 0,
-        "first_session_date": stats.first_session_date if stats else None,
-        "last_session_date": stats.last_session_date if stats else None,
-        "adhd_subtype": patient.adhd_subtype,
-        "avg_domain_scores": {
-            "memory": avg_memory_score,
-            "attention": avg_attention_score,
-            "impulse_control": avg_impulse_score,
-            "executive_function": avg_executive_score,
-        },
-        "trend_graph": trend_graph,
-    }
+# Both ends of the comparison come from the same window: the first and the
+# latest measurement taken within the last `period`. One scan of the
+# analysis table picks out both.
+PROGRESS_SQL = {
+    domain: text(f"""
+        WITH window_scores AS (
+            SELECT 
+                (array_agg(a.{column} ORDER BY a.created_at ASC))[1] AS initial_score,
+                (array_agg(a.{column} ORDER BY a.created_at DESC))[1] AS current_score,
+                MIN(a.created_at) AS initial_at,
+                MAX(a.created_at) AS current_at
+            FROM 
+                {table} a
+                JOIN sessions s ON s.session_id = a.session_id
+            WHERE 
+                s.user_id = :user_id
+                AND a.created_at >= NOW() - CAST(:interval AS interval)
+        )
+        SELECT 
+            initial_score,
+            current_score,
+            initial_at AS initial_date,
+            current_at AS current_date,
+            (current_score - initial_score) AS absolute_change,
+            CASE 
+                WHEN initial_score = 0 THEN 0
+                ELSE ((current_score - initial_score) / initial_score) * 100 
+            END AS percentage_change
+        FROM 
+            window_scores
+    """).bindparams(_USER_ID_PARAM, _INTERVAL_PARAM)
+    for domain, (table, column) in DOMAIN_TABLES.items()
+}
 
-    return profile
+# Patient, latest score and both normative bands in one round trip.
+NORMATIVE_COMPARISON_SQL = {
+    domain: text(f"""
+        WITH pt AS (
+            SELECT 
+                p.user_id,
+                p.adhd_subtype,
+                {AGE_GROUP_FUNCTION}(EXTRACT(YEAR FROM age(current_date, p.date_of_birth))::int) AS age_group
+            FROM 
+                patients p
+            WHERE 
+                p.user_id = :user_id
+        )
+        SELECT 
+            pt.adhd_subtype,
+            pt.age_group,
+            latest.score,
+            latest.created_at,
+            n.mean_score AS n_mean,
+            n.standard_deviation AS n_sd,
+            n.reference AS n_ref,
+            n.sample_size AS n_size,
+            adhd.mean_score AS a_mean,
+            adhd.standard_deviation AS a_sd,
+            adhd.reference AS a_ref
+        FROM 
+            pt
+            LEFT JOIN LATERAL (
+                SELECT a.{column} AS score, a.created_at
+                FROM {table} a
+                JOIN sessions s ON s.session_id = a.session_id
+                WHERE s.user_id = pt.user_id
+                ORDER BY a.created_at DESC
+                LIMIT 1
+            ) latest ON true
+            LEFT JOIN normative_data n 
+                ON n.domain = :domain 
+                AND n.age_group = pt.age_group 
+                AND n.clinical_group IS NULL
+            LEFT JOIN normative_data adhd 
+                ON pt.adhd_subtype IS NOT NULL 
+                AND adhd.domain = :domain 
+                AND adhd.age_group = pt.age_group 
+                AND adhd.clinical_group = 'ADHD'
+    """).bindparams(_USER_ID_PARAM, bindparam("domain", value=domain.value))
+    for domain, (table, column) in DOMAIN_TABLES.items()
+}
 
 @router.get("/timeseries/{user_id}")
 async def get_cognitive_timeseries(
     user_id: UUID,
-    domain: str = Query(..., description="Cognitive domain: attention, memory, impulse_control, executive_function"),
+    domain: CognitiveDomain = Query(..., description="Cognitive domain"),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    interval: str = Query("1 day", description="Time bucket interval (e.g., '1 day', '1 week')"),
+    interval: TimeseriesInterval = Query("1 day", description="Time bucket interval"),
     db: AsyncSession = Depends(get_session)
 ):
     """Get time series data for cognitive domain scores."""
@@ -211,286 +379,145 @@ async def get_cognitive_timeseries(
         start_date = datetime.now() - timedelta(days=90)
     if not end_date:
         end_date = datetime.now()
-    
-    domain_map = {
-        "attention": {"table": "attention_analysis", "column": "overall_score"},
-        "memory": {"table": "memory_analysis", "column": "overall_memory_score"},
-        "impulse_control": {"table": "impulse_analysis", "column": "overall_impulse_control_score"},
-        "executive_function": {"table": "executive_function_analysis", "column": "executive_function_score"}
-    }
-    
-    if domain not in domain_map:
-        raise HTTPException(status_code=400, detail=f"Invalid domain: {domain}")
-    
-    table = domain_map[domain]["table"]
-    column = domain_map[domain]["column"]
-
-    # امنع SQL Injection عبر التحقق من صيغة الـ interval
-    allowed_intervals = {"1 day", "1 week", "1 month", "1 hour"}
-    if interval not in allowed_intervals:
-        raise HTTPException(status_code=400, detail=f"Invalid interval: {interval}")
 
-    query = f"""
-        SELECT 
-            time_bucket('{interval}', created_at) AS time_bucket,
-            AVG({column}) AS avg_score
-        FROM 
-            {table}
-        WHERE 
-            session_id IN (SELECT session_id FROM sessions WHERE user_id = :user_id)
-            AND created_at BETWEEN :start_date AND :end_date
-        GROUP BY 
-            time_bucket
-        ORDER BY 
-            time_bucket ASC
-    """
+    if interval != "1 hour" and daily_score_views_ready():
+        query = DAILY_TIMESERIES_SQL[domain]
+    else:
+        query = TIMESERIES_SQL[domain]
 
     result = await db.execute(
-        text(query),
+        query,
         {
-            "user_id": str(user_id),
+            "user_id": user_id,
+            "interval": interval,
             "start_date": start_date,
             "end_date": end_date,
         }
     )
 
-    data = result.fetchall()
-    return [{"date": row.time_bucket, "score": float(row.avg_score)} for row in data]
+    return [{"date": bucket, "score": score} for bucket, score in result]
 
 @router.get("/progress/{user_id}")
 async def get_cognitive_progress(
     user_id: UUID,
-    domain: str = Query(..., description="Cognitive domain: attention, memory, impulse_control, executive_function"),
-    period: str = Query("90d", description="Period for comparison: 30d, 60d, 90d"),
+    domain: CognitiveDomain = Query(..., description="Cognitive domain"),
+    period: ProgressPeriod = Query("90d", description="Period for comparison"),
     db: AsyncSession = Depends(get_session)
 ):
     """Get progress comparison data for a cognitive domain."""
-    # Map domain to table and column
-    domain_map = {
-        "attention": {"table": "attention_analysis", "column": "overall_score"},
-        "memory": {"table": "memory_analysis", "column": "overall_memory_score"},
-        "impulse_control": {"table": "impulse_analysis", "column": "overall_impulse_control_score"},
-        "executive_function": {"table": "executive_function_analysis", "column": "executive_function_score"}
-    }
-    
-    if domain not in domain_map:
-        raise HTTPException(status_code=400, detail=f"Invalid domain: {domain}")
-    
-    table = domain_map[domain]["table"]
-    column = domain_map[domain]["column"]
-    
-    # Map period string to interval
-    period_map = {
-        "30d": "30 days",
-        "60d": "60 days",
-        "90d": "90 days"
-    }
-    interval = period_map.get(period, "90 days")
-    
-    query = f"""
-        WITH first_measurement AS (
-            SELECT 
-                {column} AS score,
-                created_at
-            FROM 
-                {table}
-            WHERE 
-                session_id IN (SELECT session_id FROM sessions WHERE user_id = :user_id)
-                AND created_at >= NOW() - INTERVAL :interval
-            ORDER BY 
-                created_at ASC
-            LIMIT 1
-        ),
-        latest_measurement AS (
-            SELECT 
-                {column} AS score,
-                created_at
-            FROM 
-                {table}
-            WHERE 
-                session_id IN (SELECT session_id FROM sessions WHERE user_id = :user_id)
-            ORDER BY 
-                created_at DESC
-            LIMIT 1
-        )
-        SELECT 
-            f.score AS initial_score,
-            l.score AS current_score,
-            f.created_at AS initial_date,
-            l.created_at AS current_date,
-            (l.score - f.score) AS absolute_change,
-            CASE 
-                WHEN f.score = 0 THEN 0
-                ELSE ((l.score - f.score) / f.score) * 100 
-            END AS percentage_change
-        FROM 
-            first_measurement f,
-            latest_measurement l
-    """
+    interval = PROGRESS_PERIODS[period]
     
     result = await db.execute(
-        text(query),
+        PROGRESS_SQL[domain],
         {
-            "user_id": str(user_id),
+            "user_id": user_id,
             "interval": interval
         }
     )
     
-    data = result.fetchone()
-    
-    if not data:
-        raise HTTPException(status_code=404, detail=f"No {domain} progress data found for user")
+    # The aggregate always yields a row; an empty window leaves it all NULL.
+    data = result.mappings().one()
+    if data["initial_score"] is None:
+        raise HTTPException(status_code=404, detail=f"No {domain.value} progress data found for user")
     
+    # The row's columns are exactly the score/date/change fields returned.
     return {
         "user_id": user_id,
         "domain": domain,
         "period": period,
-        "initial_score": float(data.initial_score),
-        "current_score": float(data.current_score),
-        "initial_date": data.initial_date,
-        "current_date": data.current_date,
-        "absolute_change": float(data.absolute_change),
-        "percentage_change": float(data.percentage_change)
+        **data,
     }
 
-async def fetch_latest_analysis(db: AsyncSession, model, session_id: UUID):
+async def fetch_latest_analysis(db: AsyncSession, model, columns, session_id: UUID):
+    # Only the columns the response needs, as a plain Row: no ORM
+    # hydration or identity-map bookkeeping.
     result = await db.execute(
-        select(model)
+        select(*columns)
         .where(model.session_id == session_id)
         .order_by(model.created_at.desc())
         .limit(1)
     )
-    return result.scalar_one_or_none()
+    return result.one_or_none()
 
 @router.get("/component-details/{session_id}")
 async def get_component_details(
     session_id: UUID,
-    domain: str = Query(..., description="One of: memory, impulse_control, attention, executive_function"),
+    domain: CognitiveDomain = Query(..., description="Cognitive domain"),
     db: AsyncSession = Depends(get_session)
 ):
-    domain_config = DOMAIN_CONFIG.get(domain)
-
-    if not domain_config:
-        raise HTTPException(status_code=400, detail="Invalid domain")
+    domain_config = DOMAIN_CONFIG[domain]
 
     model = domain_config["model"]
     builder = domain_config["build_response"]
 
-    obj = await fetch_latest_analysis(db, model, session_id)
+    obj = await fetch_latest_analysis(db, model, domain_config["columns"], session_id)
 
     if not obj:
-        raise HTTPException(status_code=404, detail=f"No {domain} analysis found for session")
+        raise HTTPException(status_code=404, detail=f"No {domain.value} analysis found for session")
 
     return {
         "session_id": session_id,
         "domain": domain,
         **builder(obj)
     }
+
+# Row values besides the score timestamp that shape the response.
+_NORMATIVE_ETAG_FIELDS = (
+    "adhd_subtype", "n_mean", "n_sd", "n_ref", "n_size", "a_mean", "a_sd", "a_ref",
+)
+
 @router.get("/normative-comparison/{user_id}")
 async def get_normative_comparison(
     user_id: UUID,
-    domain: str = Query(..., description="Cognitive domain: attention, memory, impulse_control, executive_function"),
+    request: Request,
+    response: Response,
+    domain: CognitiveDomain = Query(..., description="Cognitive domain"),
     db: AsyncSession = Depends(get_session)
 ):
     """Get normative comparison data for a user's cognitive domain."""
-    # Map domain to table and column
-    domain_map = {
-        "attention": {"table": "attention_analysis", "column": "overall_score"},
-        "memory": {"table": "memory_analysis", "column": "overall_memory_score"},
-        "impulse_control": {"table": "impulse_analysis", "column": "overall_impulse_control_score"},
-        "executive_function": {"table": "executive_function_analysis", "column": "executive_function_score"}
-    }
-    
-    if domain not in domain_map:
-        raise HTTPException(status_code=400, detail=f"Invalid domain: {domain}")
-    
-    table = domain_map[domain]["table"]
-    column = domain_map[domain]["column"]
-    
-    # Get patient info for age group
-    patient_result = await db.execute(
-        select(Patient)
-        .where(Patient.user_id == user_id)
-    )
-    patient = patient_result.scalar_one_or_none()
+    result = await db.execute(NORMATIVE_COMPARISON_SQL[domain], {"user_id": user_id})
+    row = result.mappings().one_or_none()
     
-    if not patient:
+    if not row:
         raise HTTPException(status_code=404, detail="Patient not found")
     
-    # Calculate age and age group
-    today = datetime.utcnow().date()
-    age = (
-        today.year
-        - patient.date_of_birth.year
-        - ((today.month, today.day) < (patient.date_of_birth.month, patient.date_of_birth.day))
-    )
-    
-    age_group = get_age_group(age)
-    # Get latest score
-    query = f"""
-        SELECT 
-            {column} AS score,
-            created_at
-        FROM 
-            {table}
-        WHERE 
-            session_id IN (SELECT session_id FROM sessions WHERE user_id = :user_id)
-        ORDER BY 
-            created_at DESC
-        LIMIT 1
-    """
-    
-    result = await db.execute(text(query), {"user_id": str(user_id)})
-    user_data = result.fetchone()
+    if row["score"] is None:
+        raise HTTPException(status_code=404, detail=f"No {domain.value} data found for user")
     
-    if not user_data:
-        raise HTTPException(status_code=404, detail=f"No {domain} data found for user")
+    age_group = row["age_group"]
+    if row["n_mean"] is None:
+        raise HTTPException(status_code=404, detail=f"No normative data found for {domain.value} in age group {age_group}")
     
-    user_score = float(user_data.score)
+    # The comparison only changes when a newer score lands, the patient
+    # moves age group or gets a diagnosis, or the normative bands are
+    # edited, so let polling clients revalidate against all of those.
+    band_digest = hashlib.blake2b(
+        repr(tuple(row[k] for k in _NORMATIVE_ETAG_FIELDS)).encode(), digest_size=8
+    ).hexdigest()
+    etag = f'W/"{int(row["created_at"].timestamp())}-{domain.value}-{age_group}-{band_digest}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, max-age=30"
     
-    # Get normative data
-    norm_result = await db.execute(
-        select(NormativeData)
-        .where(
-            NormativeData.domain == domain,
-            NormativeData.age_group == age_group,
-            NormativeData.clinical_group == None
-        )
-    )
-    norm_data = norm_result.scalar_one_or_none()
-    
-    if not norm_data:
-        raise HTTPException(status_code=404, detail=f"No normative data found for {domain} in age group {age_group}")
+    user_score = float(row["score"])
     
     # Calculate z-score and percentile
-    z_score = (user_score - norm_data.mean_score) / norm_data.standard_deviation
+    z_score = (user_score - row["n_mean"]) / row["n_sd"]
     
-    # Calculate percentile using error function
-    import math
-    percentile = 100 * (0.5 * (1 + math.erf(z_score / math.sqrt(2))))
+    percentile = z_to_percentile(z_score)
     
     # Get ADHD comparison if available
     adhd_comparison = None
-    if patient.adhd_subtype:
-        adhd_result = await db.execute(
-            select(NormativeData)
-            .where(
-                NormativeData.domain == domain,
-                NormativeData.age_group == age_group,
-                NormativeData.clinical_group == "ADHD"
-            )
-        )
-        adhd_data = adhd_result.scalar_one_or_none()
+    if row["a_mean"] is not None:
+        adhd_z_score = (user_score - row["a_mean"]) / row["a_sd"]
+        adhd_percentile = z_to_percentile(adhd_z_score)
         
-        if adhd_data:
-            adhd_z_score = (user_score - adhd_data.mean_score) / adhd_data.standard_deviation
-            adhd_percentile = 100 * (0.5 * (1 + math.erf(adhd_z_score / math.sqrt(2))))
-            
-            adhd_comparison = {
-                "z_score": round(adhd_z_score, 2),
-                "percentile": round(adhd_percentile, 1),
-                "reference": adhd_data.reference
-            }
+        adhd_comparison = {
+            "z_score": round(adhd_z_score, 2),
+            "percentile": round(adhd_percentile, 1),
+            "reference": row["a_ref"]
+        }
     
     return {
         "user_id": user_id,
@@ -498,12 +525,27 @@ async def get_normative_comparison(
         "age_group": age_group,
         "raw_score": user_score,
         "normative_comparison": {
-            "mean": norm_data.mean_score,
-            "standard_deviation": norm_data.standard_deviation,
+            "mean": row["n_mean"],
+            "standard_deviation": row["n_sd"],
             "z_score": round(z_score, 2),
             "percentile": round(percentile, 1),
-            "reference": norm_data.reference,
-            "sample_size": norm_data.sample_size
+            "reference": row["n_ref"],
+            "sample_size": row["n_size"]
         },
         "adhd_comparison": adhd_comparison
     }
+
+@router.post("/normative-cache/clear", status_code=204)
+async def clear_normative_data_cache(current_admin=Depends(get_current_admin)):
+    """
+    Drop every API and worker process's cached normative bands after
+    normative_data changes, by bumping the norms version in Redis.
+    """
+    try:
+        await clear_normative_cache()
+    except (RedisError, OSError):
+        raise HTTPException(
+            status_code=503,
+            detail="Could not reach Redis; other processes pick up the change within an hour"
+        )
+    return Response(status_code=204)
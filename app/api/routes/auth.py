@@ -34,8 +34,12 @@ async def login(
             )
 
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        token_data = {"sub": user.email, "user_role": user.role, "user_id": str(user.user_id)}
+        if user.role in (UserRole.DOCTOR, UserRole.PATIENT):
+            # Clinician and Patient rows share the user's primary key.
+            token_data["role_entity_id"] = str(user.user_id)
         access_token = create_access_token(
-            data={"sub": user.email, "user_role": user.role, "user_id": str(user.user_id)},
+            data=token_data,
             expires_delta=access_token_expires
         )
         return {"access_token": access_token, "token_type": "bearer" }
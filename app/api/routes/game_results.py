@@ -1,18 +1,20 @@
 import asyncio
 from typing import Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query, status ,BackgroundTasks
+from fastapi.responses import ORJSONResponse
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from app.db.database import get_session
 from app.schemas.game_result_schema import GameResultMatchingCreate, GameResultSequenceCreate
 from app.schemas.sessions_schema import SessionCreate, SessionCreateResponse, SessionResponse
-from app.services.cognitive_assessment_service import CognitiveAssessmentService
+from app.services.cognitive_assessment_service import run_cognitive_assessment
 from app.services.game_result_services import GameResultService
-from app.api.dependinces import get_current_patient, get_current_user
+from app.api.dependinces import authorize_patient_data, get_current_patient, get_current_user
 from app.db.models import Patient, User, UserRole
 from app.services.mini_games_services import MiniGameService
 from app.services.session_service import SessionService
+from app.utils.task_queue import enqueue_cognitive_assessment
 
 router = APIRouter(tags=["Game Results"])
 
@@ -75,46 +77,35 @@ router = APIRouter(tags=["Game Results"])
     response_model=dict,
     status_code=status.HTTP_200_OK,
     summary="Retrieve all sessions, game results, and mini-game matrices for a user",
-    description="Endpoint to retrieve all sessions, game results, and mini-game matrices for a specific user. Accessible by the user or their doctor."
+    description="Endpoint to retrieve all sessions, game results, and mini-game matrices for a specific user. Accessible by the user or their doctor.",
+    dependencies=[Depends(authorize_patient_data)],
 )
 async def get_user_data(
     user_id: UUID,
     session: AsyncSession = Depends(get_session),
-    current_user: Tuple[User, UserRole] = Depends(get_current_user),
+    # A second session (use_cache=False, or FastAPI hands back the same
+    # one) so the two reads below can run concurrently.
+    results_session: AsyncSession = Depends(get_session, use_cache=False),
     limit: int = Query(10, ge=1, le=100),  # Limit the number of results (default: 10, max: 100)
     offset: int = Query(0, ge=0) 
 ):
-    user, role = current_user
-
-    # Authorization checks
-    if role == UserRole.PATIENT and user.user_id != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You do not have permission to access this data"
-        )
-
-    if role == UserRole.DOCTOR:
-        result = await session.execute(
-            select(Patient).where(Patient.user_id == user_id, Patient.clinician_id == user.user_id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have permission to access this data"
-            )
-
     # Retrieve data
     session_service = SessionService(session)
-    game_result_service = GameResultService(session)
+    game_result_service = GameResultService(results_session)
 
-    sessions = await session_service.get_sessions_by_patient_id(user_id , limit , offset)
-    game_results = await game_result_service.get_game_results_by_user_id(user_id)
+    (sessions, total_sessions), game_results = await asyncio.gather(
+        session_service.get_sessions_by_patient_id(user_id, limit, offset),
+        game_result_service.get_game_results_by_user_id(user_id),
+    )
 
-    return {
-        "sessions": sessions,
-        "game_results": game_results,
-    }
+    # Dump the models and hand them straight to orjson rather than routing
+    # every nested metric back through response_model validation and
+    # jsonable_encoder; orjson handles the UUIDs, datetimes and enums itself.
+    return ORJSONResponse({
+        "sessions": [s.model_dump() for s in sessions],
+        "total_sessions": total_sessions,
+        "game_results": [r.model_dump() for r in game_results],
+    })
 
 @router.post(
         "/user-data/",
@@ -128,7 +119,6 @@ async def create_user_data(
         background_tasks: BackgroundTasks,
         user_id: UUID = Query(..., description="The ID of the user"),  # Add user_id as a query parameter
         session: AsyncSession = Depends(get_session),
-        background_session: AsyncSession = Depends(get_session),
         current_user: Patient = Depends(get_current_patient),
     ):
         # Authorization check: Only the current patient can create data
@@ -142,12 +132,17 @@ async def create_user_data(
         service = SessionService(session )
         created_session_response = await service.create_session(session_data , user_id)
 
-        cognitive_assessment_service = CognitiveAssessmentService(background_session)
-
-        background_tasks.add_task(
-             cognitive_assessment_service.calculate_and_save_cognitive_assessment,
+        # Scoring runs in the arq worker so it doesn't compete with requests
+        # for this process. Without Redis, fall back to running it here after
+        # the response, on a session of its own.
+        queued = await enqueue_cognitive_assessment(
              created_session_response.session_id,
              current_user.date_of_birth)
+        if not queued:
+            background_tasks.add_task(
+                 run_cognitive_assessment,
+                 created_session_response.session_id,
+                 current_user.date_of_birth)
 
 
         return created_session_response
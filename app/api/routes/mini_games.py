@@ -1,6 +1,8 @@
 from typing import List ,Tuple
 from uuid import UUID
-from fastapi import APIRouter, Body, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.dependinces import get_current_user
 from app.db.database import get_session
@@ -9,62 +11,70 @@ from app.services.mini_games_services import MiniGameService
 from app.schemas.mini_games_schema import (
     SequenceMemoryMetricsResponse,
     MatchingCardsMetricsResponse,
-    SequenceMemoryMetricCreate,
-    MatchingCardsMetricCreate,
 )
 
 router = APIRouter(prefix="/metrics", tags=["Metrics"])
 
-@router.get(
-    "/sequence/{result_id}",
-    response_model=List[SequenceMemoryMetricsResponse],
-    status_code=status.HTTP_200_OK,
-    summary="Retrieve sequence memory metrics for a specific game result",
-)
-async def get_sequence_metrics(
+
+async def _get_authorized_metrics(
+    service: MiniGameService,
+    metric_type: str,
     result_id: UUID,
-    session: AsyncSession = Depends(get_session),
-    current_user: Tuple[User, UserRole] = Depends(get_current_user),
+    current_user: Tuple[User, UserRole],
 ):
-    service = MiniGameService(session)
-
-    # Fetch the session associated with the result_id
-    game_result = await service.get_game_result_by_id(result_id)
-    if not game_result:
+    """Load a game result's metrics, enforcing that the caller owns or treats the patient."""
+    found = await service.get_metrics_with_owner(metric_type, result_id)
+    if found is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Game result not found.",
         )
-
-    session_data = await service.get_session_by_id(game_result.session_id)
-    if not session_data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found.",
-        )
+    metrics, owner_id, clinician_id = found
 
     user, role = current_user
     if role == UserRole.PATIENT:
-        if session_data.user_id != user.user_id:
+        if owner_id != user.user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to access this data.",
             )
     elif role == UserRole.DOCTOR:
         # Ensure the session belongs to a patient associated with the clinician
-        if session_data.clinician_id != user.user_id:
+        if clinician_id != user.user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to access this data.",
             )
 
-    # Fetch and return the metrics
-    return await service.get_metrics_by_type("sequence", result_id)
+    return metrics
+
+
+def _dump_metrics(response_model: type[BaseModel], metrics) -> ORJSONResponse:
+    """Serialise metric rows straight to JSON, keeping only the response model's fields."""
+    # The rows come from our own tables, so re-validating them through
+    # response_model and jsonable_encoder buys nothing; the model stays in
+    # the route's `responses` for the OpenAPI schema.
+    fields = tuple(response_model.model_fields)
+    return ORJSONResponse([{name: getattr(metric, name) for name in fields} for metric in metrics])
+
+@router.get(
+    "/sequence/{result_id}",
+    responses={200: {"model": List[SequenceMemoryMetricsResponse]}},
+    status_code=status.HTTP_200_OK,
+    summary="Retrieve sequence memory metrics for a specific game result",
+)
+async def get_sequence_metrics(
+    result_id: UUID,
+    session: AsyncSession = Depends(get_session),
+    current_user: Tuple[User, UserRole] = Depends(get_current_user),
+):
+    metrics = await _get_authorized_metrics(MiniGameService(session), "sequence", result_id, current_user)
+    return _dump_metrics(SequenceMemoryMetricsResponse, metrics)
 
 
 @router.get(
     "/matching/{result_id}",
-    response_model=List[MatchingCardsMetricsResponse],
+    responses={200: {"model": List[MatchingCardsMetricsResponse]}},
     status_code=status.HTTP_200_OK,
     summary="Retrieve matching cards metrics for a specific game result",
 )
@@ -73,37 +83,5 @@ async def get_matching_cards_metrics(
     session: AsyncSession = Depends(get_session),
     current_user: Tuple[User, UserRole] = Depends(get_current_user),
 ):
-    service = MiniGameService(session)
-
-    # Fetch the session associated with the result_id
-    game_result = await service.get_game_result_by_id(result_id)
-    if not game_result:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game result not found.",
-        )
-
-    session_data = await service.get_session_by_id(game_result.session_id)
-    if not session_data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found.",
-        )
-
-    user, role = current_user
-    if role == UserRole.PATIENT:
-        if session_data.user_id != user.user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have permission to access this data.",
-            )
-    elif role == UserRole.DOCTOR:
-        # Ensure the session belongs to a patient associated with the clinician
-        if session_data.clinician_id != user.user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have permission to access this data.",
-            )
-
-    # Fetch and return the metrics
-    return await service.get_metrics_by_type("matching", result_id)
\ No newline at end of file
+    metrics = await _get_authorized_metrics(MiniGameService(session), "matching", result_id, current_user)
+    return _dump_metrics(MatchingCardsMetricsResponse, metrics)
\ No newline at end of file
@@ -1,26 +1,55 @@
 # app/routers/patients.py
+import base64
+from collections import deque
 from datetime import datetime, timedelta
+import hashlib
 import secrets
 from typing import List
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException , status
-from pydantic import EmailStr
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException , Query, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import EmailStr, TypeAdapter
+from sqlalchemy import select, update
 from sqlmodel import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependinces import get_current_clinician, get_current_patient, get_current_user
+from app.api.dependinces import forget_clinician_patients, get_current_clinician, get_current_patient, get_current_user, user_cache
 from app.db.models import Clinician ,Patient, User
 from app.schemas.auth_schema import PatientResponse
-from app.db.database import get_session
+from app.db.database import background_sessionmaker, get_session
 from app.schemas.user_schema import UserUpdateByEmail
 
 router = APIRouter(tags=["Patients"])
 
+# Validates and serialises a whole patient list in one pydantic-core call.
+_PATIENT_LIST_ADAPTER = TypeAdapter(List[PatientResponse])
+
 from datetime import datetime, timedelta
 import secrets
 from app.db.models import InvitationToken
 
+
+_INVITATION_TOKEN_BYTES = 32
+# Tokens are cut from one os.urandom read per batch rather than one per invite.
+_INVITATION_TOKEN_BATCH = 64
+_invitation_tokens: deque = deque()
+
+
+def _new_invitation_token() -> str:
+    """A fresh URL-safe invitation token, as secrets.token_urlsafe(32) would give."""
+    if not _invitation_tokens:
+        raw = secrets.token_bytes(_INVITATION_TOKEN_BYTES * _INVITATION_TOKEN_BATCH)
+        _invitation_tokens.extend(
+            base64.urlsafe_b64encode(raw[i:i + _INVITATION_TOKEN_BYTES]).rstrip(b"=").decode("ascii")
+            for i in range(0, len(raw), _INVITATION_TOKEN_BYTES)
+        )
+    return _invitation_tokens.popleft()
+
+
+def _invitation_token_key(token: str) -> str:
+    """The stored form of an invitation token: its SHA-256 hex digest."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
 @router.post("/generate-invitation-link", status_code=status.HTTP_200_OK)
 async def generate_invitation_link(
     patient_email: EmailStr,
@@ -31,12 +60,13 @@ async def generate_invitation_link(
     Generate a unique invitation link for the clinician to share with a patient.
     """
     # Generate a secure token
-    token = secrets.token_urlsafe(32)
+    token = _new_invitation_token()
     expiration = datetime.utcnow() + timedelta(hours=24)  # Token expires in 24 hours
 
     # Save the token in the database
+    # Only the digest is stored, so a leaked table holds no usable links.
     invitation = InvitationToken(
-        token=token,
+        token=_invitation_token_key(token),
         clinician_id=current_clinician.user_id,
         patient_email=patient_email,  # Include patient_email
 
@@ -55,31 +85,34 @@ async def update_user_by_email(
     update_data: UserUpdateByEmail,
     session: AsyncSession = Depends(get_session),
 ):
-    # Fetch the user
-    result = await session.execute(select(User).where(User.email == update_data.email))
-    user = result.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Update allowed fields in User
+    # Plain UPDATE statements: nothing is loaded into the session first.
     if update_data.username:
-        user.username = update_data.username
-    session.add(user)
+        result = await session.execute(
+            update(User)
+            .where(User.email == update_data.email)
+            .values(username=update_data.username)
+            .returning(User.user_id)
+        )
+    else:
+        result = await session.execute(select(User.user_id).where(User.email == update_data.email))
+    user_id = result.scalar_one_or_none()
 
-    # Check if patient exists for this user
-    result = await session.execute(select(Patient).where(Patient.user_id == user.user_id))
-    patient = result.scalar_one_or_none()
+    if not user_id:
+        raise HTTPException(status_code=404, detail="User not found")
 
-    if patient:
-        # Update allowed fields in Patient
-        for field in ["first_name", "last_name", "gender", "date_of_birth", "phone_number"]:
-            value = getattr(update_data, field)
-            if value is not None:
-                setattr(patient, field, value)
-        session.add(patient)
+    # Update allowed fields in Patient, if this user has a patient profile
+    patient_values = {
+        field: value
+        for field in ["first_name", "last_name", "gender", "date_of_birth", "phone_number"]
+        if (value := getattr(update_data, field)) is not None
+    }
+    if patient_values:
+        await session.execute(
+            update(Patient).where(Patient.user_id == user_id).values(**patient_values)
+        )
 
     await session.commit()
+    await user_cache.invalidate(update_data.email)
     return {"message": "User and patient profile updated successfully"}
 
 @router.get("/accept-invitation", status_code=status.HTTP_200_OK)
@@ -91,56 +124,79 @@ async def accept_invitation(
     """
     Accept an invitation and assign the clinician to the patient.
     """
-    # Validate the token
-    result = await session.execute(select(InvitationToken).where(InvitationToken.token == token))
-    invitation = result.scalar_one_or_none()
+    token_key = _invitation_token_key(token)
 
-    if not invitation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Invalid invitation token."
-        )
-
-    if invitation.used:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="This invitation token has already been used."
+    # Validate and consume the token in one statement, so two concurrent
+    # accepts can't both succeed.
+    result = await session.execute(
+        update(InvitationToken)
+        .where(
+            InvitationToken.token == token_key,
+            InvitationToken.used.is_(False),
+            InvitationToken.expires_at >= datetime.utcnow(),
         )
-
-    if invitation.expires_at < datetime.utcnow():
+        .values(used=True)
+        .returning(InvitationToken.clinician_id)
+    )
+    clinician_id = result.scalar_one_or_none()
+
+    if clinician_id is None:
+        # Only failed accepts pay for working out why.
+        result = await session.execute(select(InvitationToken).where(InvitationToken.token == token_key))
+        invitation = result.scalar_one_or_none()
+        if not invitation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Invalid invitation token."
+            )
+        if invitation.used:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This invitation token has already been used."
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="This invitation token has expired."
         )
 
     # Assign the clinician to the patient
-    current_patient.clinician_id = invitation.clinician_id
-    session.add(current_patient)
-
-    # Mark the token as used
-    invitation.used = True
-    session.add(invitation)
+    previous_clinician_id = current_patient.clinician_id
+    await session.execute(
+        update(Patient)
+        .where(Patient.user_id == current_patient.user_id)
+        .values(clinician_id=clinician_id)
+    )
 
     await session.commit()
-    await session.refresh(current_patient)
+
+    await forget_clinician_patients(clinician_id)
+    if previous_clinician_id is not None:
+        await forget_clinician_patients(previous_clinician_id)
 
     return {"message": "You have successfully accepted the invitation."}
 
-@router.get("/{clinician_id}/patients", status_code=status.HTTP_200_OK)
+async def _stream_clinician_patients(clinician_id: UUID):
+    # The request's session is closed before a streamed body is sent, so the
+    # cursor needs a session of its own.
+    async with background_sessionmaker() as session:
+        patients = await session.stream_scalars(
+            select(Patient).where(Patient.clinician_id == clinician_id)
+        )
+        async for patient in patients:
+            yield PatientResponse.model_validate(patient).model_dump_json().encode() + b"\n"
+
+
+@router.get("/{clinician_id}/patients", status_code=status.HTTP_200_OK, responses={200: {"model": List[PatientResponse]}})
 async def get_all_patients_for_clinician(
     clinician_id: UUID,
+    stream: bool = Query(False, description="Stream the patients as NDJSON, one object per line"),
     session: AsyncSession = Depends(get_session),
     # current_user: Clinician = Depends(get_current_clinician),
 ):
-
-    result = await session.execute(select(Clinician).where(Clinician.user_id == clinician_id))
-    clinician = result.scalar_one_or_none()
-
-    # if not clinician:
-    #     raise HTTPException(
-    #         status_code=status.HTTP_404_NOT_FOUND,
-    #         detail="Clinician not found"
-    #     )
+    if stream:
+        return StreamingResponse(
+            _stream_clinician_patients(clinician_id), media_type="application/x-ndjson"
+        )
 
     # Retrieve all patients associated with the clinician
     result = await session.execute(select(Patient).where(Patient.clinician_id == clinician_id))
@@ -152,10 +208,15 @@ async def get_all_patients_for_clinician(
     #         detail="No patients found for this clinician"
     #     )
 
-    return patients
+    return Response(
+        content=_PATIENT_LIST_ADAPTER.dump_json(
+            _PATIENT_LIST_ADAPTER.validate_python(patients, from_attributes=True)
+        ),
+        media_type="application/json",
+    )
 
 
-@router.get("/{clinician_id}/patients/{patient_id}", status_code=status.HTTP_200_OK, response_model=PatientResponse)
+@router.get("/{clinician_id}/patients/{patient_id}", status_code=status.HTTP_200_OK, responses={200: {"model": PatientResponse}})
 async def get_patient_for_clinician(
     clinician_id: UUID,
     patient_id: UUID,
@@ -170,16 +231,7 @@ async def get_patient_for_clinician(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to access this patient's data."
         )
-    # Verify if the clinician exists
-    result = await session.execute(select(Clinician).where(Clinician.user_id == clinician_id))
-    clinician = result.scalar_one_or_none()
-
-    if not clinician:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Clinician not found"
-        )
-
+    # get_current_clinician has already loaded (or 404'd on) the clinician.
     # Retrieve the patient associated with the clinician
     result = await session.execute(
         select(Patient).where(Patient.user_id == patient_id, Patient.clinician_id == clinician_id)
@@ -192,7 +244,9 @@ async def get_patient_for_clinician(
             detail="Patient not found or not associated with this clinician"
         )
 
-    return patient
+    # Copy PatientResponse's fields off the row we just loaded; validating
+    # it again through response_model would only repeat the work.
+    return ORJSONResponse({name: getattr(patient, name) for name in PatientResponse.model_fields})
 # @router.patch("/me", response_model=Patient)
 # async def update_patient_profile(
 #     update_data: PatientUpdate,
@@ -1,16 +1,19 @@
-from typing import List, Tuple
+import base64
+import binascii
+from datetime import datetime
+from typing import List, Optional, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi import Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlmodel import select
-from app.db.models import Patient, Session, User, UserRole
+from app.db.models import GameResult, Patient, Session, User, UserRole
 from app.schemas.sessions_schema import SessionCreate, SessionCreateResponse, SessionResponse
 from app.db.database import get_session
 from app.services import RoleChecker
-from app.services.session_service import SessionService
-from app.api.dependinces import get_current_patient, get_current_user
+from app.services.session_service import SESSION_LIST_ADAPTER, SESSION_RESULTS_LOAD, SessionService
+from app.api.dependinces import authorize_patient_data, get_current_patient, get_current_user
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.utils.authchecker import AuthChecker
 from fastapi import Query  
@@ -19,94 +22,88 @@ from fastapi import Query
 
 router = APIRouter(tags=["session"])
 
+# Response header carrying the cursor for the next page of sessions.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_session_cursor(session: SessionResponse) -> str:
+    raw = f"{session.session_date.isoformat()}|{session.session_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_session_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        session_date, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(session_date), UUID(session_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
 
 
 @router.get(
     "/sessions/{user_id}",
-    response_model=List[SessionResponse],
+    responses={200: {"model": List[SessionResponse]}},
     status_code=status.HTTP_200_OK,
     summary="Retrieve sessions for a specific user",
-    description="Endpoint to retrieve all sessions for a specific user by their user ID with pagination."
+    description="Endpoint to retrieve all sessions for a specific user by their user ID with pagination.",
+    dependencies=[Depends(authorize_patient_data)],
 )
 async def get_sessions_for_user(
     user_id: UUID,
     session: AsyncSession = Depends(get_session),
-    current_user: Tuple[User, UserRole] = Depends(get_current_user),  
     limit: int = Query(10, ge=1, le=100),  # Limit the number of results (default: 10, max: 100)
-    offset: int = Query(0, ge=0)  
+    offset: int = Query(0, ge=0),
+    after: Optional[str] = Query(None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER} header; takes precedence over offset"),
 ):
-    user, role = current_user  
-
-    # Check if the current user is the patient or their clinician
-    if role == UserRole.PATIENT and user.user_id != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You do not have permission to access these sessions"
-        )
-
-    if role == UserRole.DOCTOR:
-        result = await session.execute(
-            select(Patient).where(Patient.user_id == user_id, Patient.clinician_id == user.user_id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have permission to access these sessions"
-            )
-
     service = SessionService(session)
-    return await service.get_sessions_by_patient_id(user_id, limit=limit, offset=offset)
+    if after is not None or not offset:
+        sessions = await service.get_sessions_after(
+            user_id, limit=limit, after=_decode_session_cursor(after) if after else None
+        )
+    else:
+        sessions, _ = await service.get_sessions_by_patient_id(user_id, limit=limit, offset=offset)
+
+    headers = {}
+    if len(sessions) == limit:
+        headers[NEXT_CURSOR_HEADER] = _encode_session_cursor(sessions[-1])
+
+    # Already validated SessionResponse models: serialise the page in one
+    # pydantic-core call, skipping response_model.
+    return Response(
+        content=SESSION_LIST_ADAPTER.dump_json(sessions),
+        media_type="application/json",
+        headers=headers,
+    )
 
 
 
 @router.get(
     "/sessions/{user_id}/{session_id}",
-    response_model=SessionResponse,
+    responses={200: {"model": SessionResponse}},
     status_code=status.HTTP_200_OK,
     summary="Retrieve a specific session for a specific patient",
-    description="Endpoint to retrieve a specific session for a specific patient by their user ID and session ID."
+    description="Endpoint to retrieve a specific session for a specific patient by their user ID and session ID.",
+    dependencies=[Depends(authorize_patient_data)],
 )
 async def get_specific_session_for_patient(
     user_id: UUID,
     session_id: UUID,
     session: AsyncSession = Depends(get_session),
-    current_user: Tuple[User, UserRole] = Depends(get_current_user)
 ):
-    user, role = current_user  # Unpack the tuple into user and role
-
-    # Check if the current user is the patient or their clinician
-    if role == UserRole.PATIENT and user.user_id != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You do not have permission to access this session"
-        )
-
-    if role == UserRole.DOCTOR:
-        # Verify if the clinician is associated with the patient
-        result = await session.execute(
-            select(Patient).where(Patient.user_id == user_id, Patient.clinician_id == user.user_id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have permission to access this session"
-            )
-
-    # Retrieve the specific session
-    result = await session.execute(
-        select(Session)
-        .where(Session.session_id == session_id, Session.user_id == user_id)
-        .options(selectinload(Session.game_results))  # Eagerly load game_results
+    # Primary-key lookup: served from the identity map when already loaded.
+    specific_session = await session.get(
+        Session, session_id, options=[SESSION_RESULTS_LOAD]
     )
-    specific_session = result.scalar_one_or_none()
 
-    if not specific_session:
+    if specific_session is None or specific_session.user_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Session not found"
         )
 
-    return SessionResponse.from_orm(specific_session)
+    # Validate the loaded graph once here rather than again via response_model.
+    return ORJSONResponse(SessionResponse.model_validate(specific_session).model_dump())
 
@@ -1,9 +1,34 @@
-import math
 import statistics
+from functools import lru_cache
 from typing import Dict, List, Optional, Union, Tuple
 
-import statistics
-import math
+from app.utils.stats_utils import z_to_percentile
+
+# Per-age-group Go/No-Go thresholds (example values, adjust based on norms/
+# literature). Built once here rather than on every scoring call.
+# Max acceptable RT SD (ms) for response consistency.
+_GONOGO_MAX_ACCEPTABLE_SD = {
+    "5-7": 350,
+    "8-10": 300,
+    "11-13": 250,
+    "14-16": 200,
+    "adult": 180
+}
+# Expected RT range (ms) for processing speed.
+_GONOGO_MIN_EXPECTED_RT = {
+    "5-7": 400,
+    "8-10": 350,
+    "11-13": 300,
+    "14-16": 280,
+    "adult": 250
+}
+_GONOGO_MAX_EXPECTED_RT = {
+    "5-7": 1000,
+    "8-10": 900,
+    "11-13": 800,
+    "14-16": 750,
+    "adult": 700
+}
 
 def compute_gonogo_attention_score(
     commission_errors: int,
@@ -41,14 +66,7 @@ def compute_gonogo_attention_score(
     # 2. Response Consistency (Weight: 30%)
     # Measures stability of attentional state via RT variability.
     # Lower variability = better consistency.
-    # Define max acceptable SD (example values, adjust based on norms/literature for Go/No-Go)
-    max_acceptable_sd = {
-        "5-7": 350,
-        "8-10": 300,
-        "11-13": 250,
-        "14-16": 200,
-        "adult": 180
-    }.get(age_group, 250) # Default
+    max_acceptable_sd = _GONOGO_MAX_ACCEPTABLE_SD.get(age_group, 250) # Default
 
     # Normalize variability (higher score for lower SD)
     consistency_score = 0
@@ -66,21 +84,8 @@ def compute_gonogo_attention_score(
 
     # 3. Processing Speed (Weight: 10%)
     # Reflects speed of responding to targets. Faster is generally better, but very fast might link to impulsivity.
-    # Define expected RT range (example values, adjust based on norms)
-    min_expected_rt = {
-        "5-7": 400,
-        "8-10": 350,
-        "11-13": 300,
-        "14-16": 280,
-        "adult": 250
-    }.get(age_group, 300)
-    max_expected_rt = {
-        "5-7": 1000,
-        "8-10": 900,
-        "11-13": 800,
-        "14-16": 750,
-        "adult": 700
-    }.get(age_group, 800)
+    min_expected_rt = _GONOGO_MIN_EXPECTED_RT.get(age_group, 300)
+    max_expected_rt = _GONOGO_MAX_EXPECTED_RT.get(age_group, 800)
 
     speed_score = 0
     if average_reaction_time_ms > 0:
@@ -107,6 +112,21 @@ def compute_gonogo_attention_score(
 
 
 
+# Expected maximum sequence length by age group, based on Gathercole et al. (2004)
+_SEQUENCE_EXPECTED_MAX = {
+    "5-7": 5,
+    "8-10": 6,
+    "11-13": 7,
+    "14-16": 8
+}
+# Expected retention time by age group (milliseconds)
+_SEQUENCE_EXPECTED_RETENTION = {
+    "5-7": 1500,
+    "8-10": 1200,
+    "11-13": 1000,
+    "14-16": 800
+}
+
 def compute_sequence_attention_score(
     sequence_length: int,
     expected_max_sequence: int,
@@ -145,16 +165,9 @@ def compute_sequence_attention_score(
     if total_sequence_elements == 0:
         return 0.0
     
-    # Adjust expected max sequence based on age group
-    if age_group == "5-7":
-        expected_max_sequence = 5  # Based on Gathercole et al. (2004)
-    elif age_group == "8-10":
-        expected_max_sequence = 6
-    elif age_group == "11-13":
-        expected_max_sequence = 7
-    elif age_group == "14-16":
-        expected_max_sequence = 8
+    # Adjust expected max sequence based on age group;
     # else use the provided expected_max_sequence
+    expected_max_sequence = _SEQUENCE_EXPECTED_MAX.get(age_group, expected_max_sequence)
     
     # Calculate components with scientific rationale
     # 1. Sequence capacity: Ability to maintain attention on increasingly complex sequences
@@ -169,19 +182,10 @@ def compute_sequence_attention_score(
     # 3. Processing efficiency (if retention times available)
     if retention_times and len(retention_times) > 0:
         # Calculate average retention time
-        avg_retention = sum(retention_times) / len(retention_times)
+        avg_retention = statistics.fmean(retention_times)
         
         # Set expected retention time based on age group
-        if age_group == "5-7":
-            expected_retention = 1500  # milliseconds
-        elif age_group == "8-10":
-            expected_retention = 1200
-        elif age_group == "11-13":
-            expected_retention = 1000
-        elif age_group == "14-16":
-            expected_retention = 800
-        else:
-            expected_retention = 1000  # Default
+        expected_retention = _SEQUENCE_EXPECTED_RETENTION.get(age_group, 1000)  # Default
         
         # Calculate efficiency part (lower is better)
         efficiency_part = max(0, min(1, expected_retention / avg_retention))
@@ -215,6 +219,22 @@ def compute_overall_attention_score(
 
 
 
+# Normative data from Willcutt et al. (2005)
+# Format: (mean, standard_deviation)
+_TYPICAL_ATTENTION_NORMS = {
+    "5-7": (65, 15),
+    "8-10": (70, 15),
+    "11-13": (75, 12),
+    "14-16": (80, 10)
+}
+
+_ADHD_ATTENTION_NORMS = {
+    "5-7": (45, 18),
+    "8-10": (50, 18),
+    "11-13": (55, 15),
+    "14-16": (60, 15)
+}
+
 def get_attention_normative_comparison(
     attention_score: float,
     age_group: str,
@@ -241,33 +261,59 @@ def get_attention_normative_comparison(
     -----------
     Normative data based on Willcutt et al. (2005) meta-analysis
     """
-    # Normative data from Willcutt et al. (2005)
-    # Format: (mean, standard_deviation)
-    typical_norms = {
-        "5-7": (65, 15),
-        "8-10": (70, 15),
-        "11-13": (75, 12),
-        "14-16": (80, 10)
-    }
+    # Get appropriate normative data
+    if age_group not in _TYPICAL_ATTENTION_NORMS:
+        age_group = "8-10"  # Default if age group not found
+    
+    typical_mean, typical_sd = _TYPICAL_ATTENTION_NORMS[age_group]
+    (typical_z_score, typical_percentile, classification,
+     adhd_z_score, adhd_percentile) = _normative_comparison(
+        attention_score, age_group, clinical_group == "ADHD"
+    )
     
-    adhd_norms = {
-        "5-7": (45, 18),
-        "8-10": (50, 18),
-        "11-13": (55, 15),
-        "14-16": (60, 15)
+    # Prepare result
+    result = {
+        "score": attention_score,
+        "typical_mean": typical_mean,
+        "typical_sd": typical_sd,
+        "typical_z_score": typical_z_score,
+        "percentile": typical_percentile,
+        "classification": classification,
+        "reference": "Willcutt et al. (2005)"
     }
     
-    # Get appropriate normative data
-    if age_group not in typical_norms:
-        age_group = "8-10"  # Default if age group not found
+    # Add ADHD comparison if requested
+    if clinical_group == "ADHD":
+        adhd_mean, adhd_sd = _ADHD_ATTENTION_NORMS[age_group]
+        result.update({
+            "adhd_mean": adhd_mean,
+            "adhd_sd": adhd_sd,
+            "adhd_z_score": adhd_z_score,
+            "adhd_percentile": adhd_percentile
+        })
     
-    typical_mean, typical_sd = typical_norms[age_group]
+    return result
+
+
+# Scores arrive rounded to 2 dp, so the same few (score, age group) pairs
+# recur whenever a patient's history is re-read; remember their maths.
+@lru_cache(maxsize=8192)
+def _normative_comparison(
+    attention_score: float,
+    age_group: str,
+    with_adhd: bool
+) -> Tuple[float, float, str, Optional[float], Optional[float]]:
+    """
+    Rounded z-scores, percentiles and classification behind
+    get_attention_normative_comparison; age_group must be a known group.
+    """
+    typical_mean, typical_sd = _TYPICAL_ATTENTION_NORMS[age_group]
     
     # Calculate z-score compared to typical development
     typical_z_score = (attention_score - typical_mean) / typical_sd
     
     # Calculate percentile
-    typical_percentile = round(100 * (0.5 * (1 + math.erf(typical_z_score / math.sqrt(2)))), 1)
+    typical_percentile = round(z_to_percentile(typical_z_score), 1)
     
     # Determine classification
     if typical_z_score < -2:
@@ -283,29 +329,13 @@ def get_attention_normative_comparison(
     else:
         classification = "High"
     
-    # Prepare result
-    result = {
-        "score": attention_score,
-        "typical_mean": typical_mean,
-        "typical_sd": typical_sd,
-        "typical_z_score": round(typical_z_score, 2),
-        "percentile": typical_percentile,
-        "classification": classification,
-        "reference": "Willcutt et al. (2005)"
-    }
+    adhd_z_score = adhd_percentile = None
+    if with_adhd:
+        adhd_mean, adhd_sd = _ADHD_ATTENTION_NORMS[age_group]
+        adhd_z = (attention_score - adhd_mean) / adhd_sd
+        adhd_z_score = round(adhd_z, 2)
+        adhd_percentile = round(z_to_percentile(adhd_z), 1)
     
-    # Add ADHD comparison if requested
-    if clinical_group == "ADHD":
-        adhd_mean, adhd_sd = adhd_norms[age_group]
-        adhd_z_score = (attention_score - adhd_mean) / adhd_sd
-        adhd_percentile = round(100 * (0.5 * (1 + math.erf(adhd_z_score / math.sqrt(2)))), 1)
-        
-        result.update({
-            "adhd_mean": adhd_mean,
-            "adhd_sd": adhd_sd,
-            "adhd_z_score": round(adhd_z_score, 2),
-            "adhd_percentile": adhd_percentile
-        })
-    
-    return result
+    return (round(typical_z_score, 2), typical_percentile, classification,
+            adhd_z_score, adhd_percentile)
 
@@ -25,7 +25,18 @@ References:
 
 import statistics
 from typing import List, Dict, Optional, Union
-import math
+
+from app.utils.stats_utils import mean_stdev
+
+# Optimal response time ranges by age group (milliseconds)
+# Too fast = impulsive, too slow = inattentive
+_OPTIMAL_RT_RANGES = {
+    "5-7": (800, 2000),
+    "8-10": (700, 1800),
+    "11-13": (600, 1600),
+    "14-16": (500, 1400),
+    "adult": (400, 1200)
+}
 
 def compute_impulse_control_score(
     commission_errors: int = 0,
@@ -93,7 +104,7 @@ def compute_impulse_control_score(
     
     # Calculate overall inhibitory control score
     if inhibitory_control_scores:
-        inhibitory_control = statistics.mean(inhibitory_control_scores)
+        inhibitory_control = statistics.fmean(inhibitory_control_scores)
     else:
         inhibitory_control = 0
     
@@ -104,9 +115,9 @@ def compute_impulse_control_score(
     
     # Sequence task response control
     if retention_times and len(retention_times) > 1:
-        mean_rt = statistics.mean(retention_times)
+        mean_rt, sd_rt = mean_stdev(retention_times)
         if mean_rt > 0:
-            cv = statistics.stdev(retention_times) / mean_rt
+            cv = sd_rt / mean_rt
             # Convert to score (0-100), where lower CV = higher score
             # CV of 0.2 or less is considered good consistency
             sequence_response_score = max(0, min(1.0, (0.5 - cv) / 0.3)) * 100
@@ -116,15 +127,15 @@ def compute_impulse_control_score(
     
     # Card matching response control
     if time_per_match and len(time_per_match) > 1:
-        mean_rt = statistics.mean(time_per_match)
+        mean_rt, sd_rt = mean_stdev(time_per_match)
         if mean_rt > 0:
-            cv = statistics.stdev(time_per_match) / mean_rt
+            cv = sd_rt / mean_rt
             matching_response_score = max(0, min(1.0, (0.5 - cv) / 0.3)) * 100
             response_control_scores.append(matching_response_score)
     
     # Calculate overall response control score
     if response_control_scores:
-        response_control = statistics.mean(response_control_scores)
+        response_control = statistics.fmean(response_control_scores)
     else:
         response_control = 50  # Default middle value if insufficient data
     
@@ -133,23 +144,13 @@ def compute_impulse_control_score(
     # Scientific basis: Impulsivity often manifests as faster, less considered responses (Nigg, 2017)
     decision_speed_scores = []
     
-    # Define optimal response time ranges by age group (milliseconds)
-    # Too fast = impulsive, too slow = inattentive
-    optimal_ranges = {
-        "5-7": (800, 2000),
-        "8-10": (700, 1800),
-        "11-13": (600, 1600),
-        "14-16": (500, 1400),
-        "adult": (400, 1200)
-    }
-    
     # Get optimal range for age group
-    optimal_range = optimal_ranges.get(age_group, (600, 1600))
+    optimal_range = _OPTIMAL_RT_RANGES.get(age_group, (600, 1600))
     optimal_min, optimal_max = optimal_range
     
     # Sequence task decision speed
     if retention_times and len(retention_times) > 0:
-        mean_rt = statistics.mean(retention_times)
+        mean_rt = statistics.fmean(retention_times)
         # Score is highest when in optimal range, lower when too fast or too slow
         if mean_rt < optimal_min:
             # Too fast (impulsive)
@@ -165,7 +166,7 @@ def compute_impulse_control_score(
     # Crop task decision speed
     if average_reaction_time_ms is not None and average_reaction_time_ms > 0:
         # Use same optimal range logic as before
-        optimal_range = optimal_ranges.get(age_group, (600, 1600))
+        optimal_range = _OPTIMAL_RT_RANGES.get(age_group, (600, 1600))
         optimal_min, optimal_max = optimal_range
         if average_reaction_time_ms < optimal_min:
             gonogo_speed_score = (average_reaction_time_ms / optimal_min) * 100
@@ -179,7 +180,7 @@ def compute_impulse_control_score(
     
     # Card matching decision speed
     if time_per_match and len(time_per_match) > 0:
-        mean_rt = statistics.mean(time_per_match)
+        mean_rt = statistics.fmean(time_per_match)
         if mean_rt < optimal_min:
             matching_speed_score = (mean_rt / optimal_min) * 100
         elif mean_rt > optimal_max:
@@ -190,7 +191,7 @@ def compute_impulse_control_score(
     
     # Calculate overall decision speed score
     if decision_speed_scores:
-        decision_speed = statistics.mean(decision_speed_scores)
+        decision_speed = statistics.fmean(decision_speed_scores)
     else:
         decision_speed = 50  # Default middle value if insufficient data
     
@@ -22,7 +22,34 @@ References:
 
 import statistics
 from typing import List, Dict, Optional, Union
-import math
+
+from app.utils.stats_utils import mean_stdev, z_to_percentile
+
+# Per-age-group expectations, built once rather than on every scoring call.
+# Expected maximum sequence span
+_EXPECTED_MAX_SEQUENCE = {
+    "5-7": 5,    # Young children have lower capacity
+    "8-10": 6,   # Older children
+    "11-13": 7,  # Adolescents
+    "14-16": 8,  # Teenagers
+    "adult": 9   # Adults
+}
+# Optimal time per card match (milliseconds)
+_OPTIMAL_MATCH_TIME_RANGES = {
+    "5-7": (2000, 5000),  # 2-5 seconds
+    "8-10": (1500, 4000),
+    "11-13": (1200, 3500),
+    "14-16": (1000, 3000),
+    "adult": (800, 2500)
+}
+# Expected number of matches attempted
+_EXPECTED_MATCHES = {
+    "5-7": 10,
+    "8-10": 12,
+    "11-13": 15,
+    "14-16": 18,
+    "adult": 20
+}
 
 
 def compute_memory_score(
@@ -79,14 +106,7 @@ def compute_memory_score(
         expected_max_sequence = 9  # Based on average adult capacity of 7±2 items
         if age_group:
             # Adjust expected maximum based on age group
-            age_adjustments = {
-                "5-7": 5,    # Young children have lower capacity
-                "8-10": 6,   # Older children
-                "11-13": 7,  # Adolescents
-                "14-16": 8,  # Teenagers
-                "adult": 9   # Adults
-            }
-            expected_max_sequence = age_adjustments.get(age_group, 9)
+            expected_max_sequence = _EXPECTED_MAX_SEQUENCE.get(age_group, 9)
         
         # Calculate normalized span score (0-100)
         span_capacity = min(sequence_length / expected_max_sequence, 1.0) * 100
@@ -116,9 +136,9 @@ def compute_memory_score(
         # Scientific basis: Response variability indicates attentional fluctuation (Klingberg, 2010)
         if retention_times and len(retention_times) > 1:
             # Calculate coefficient of variation (lower is better)
-            mean_rt = statistics.mean(retention_times)
+            mean_rt, sd_rt = mean_stdev(retention_times)
             if mean_rt > 0:
-                cv = statistics.stdev(retention_times) / mean_rt
+                cv = sd_rt / mean_rt
                 # Convert to score (0-100), where lower CV = higher score
                 # CV of 0.2 or less is considered good consistency
                 processing_speed = max(0, min(1.0, (0.5 - cv) / 0.3)) * 100
@@ -159,17 +179,10 @@ def compute_memory_score(
         # Based on time taken per match
         # Scientific basis: Processing speed reflects memory access efficiency (Cowan, 2010)
         if time_per_match and len(time_per_match) > 0:
-            avg_time = statistics.mean(time_per_match)
+            avg_time = statistics.fmean(time_per_match)
             # Faster times = better efficiency (within reasonable limits)
             # Optimal time range depends on age group
-            optimal_ranges = {
-                "5-7": (2000, 5000),  # 2-5 seconds
-                "8-10": (1500, 4000),
-                "11-13": (1200, 3500),
-                "14-16": (1000, 3000),
-                "adult": (800, 2500)
-            }
-            optimal_range = optimal_ranges.get(age_group, (1200, 3500))
+            optimal_range = _OPTIMAL_MATCH_TIME_RANGES.get(age_group, (1200, 3500))
             optimal_min, optimal_max = optimal_range
             
             if avg_time < optimal_min:
@@ -191,14 +204,7 @@ def compute_memory_score(
         # Scientific basis: Memory load capacity reflects visual working memory limits (Cowan, 2001)
         expected_matches = 15  # Typical number in a memory card game
         if age_group:
-            age_adjustments = {
-                "5-7": 10,
-                "8-10": 12,
-                "11-13": 15,
-                "14-16": 18,
-                "adult": 20
-            }
-            expected_matches = age_adjustments.get(age_group, 15)
+            expected_matches = _EXPECTED_MATCHES.get(age_group, 15)
             
         memory_load = min(matches_attempted / expected_matches, 1.0) * 100
         
@@ -285,6 +291,16 @@ def interpret_memory_score(score: float) -> str:
         return "Impaired memory capacity"
 
 
+# Default memory norms, based on a simplified approximation of the population
+# distribution. In a real implementation, this would come from empirical studies.
+_DEFAULT_MEMORY_NORMS = {
+    "5-7": {"mean": 65, "std": 12},
+    "8-10": {"mean": 70, "std": 12},
+    "11-13": {"mean": 75, "std": 12},
+    "14-16": {"mean": 78, "std": 12},
+    "adult": {"mean": 80, "std": 12}
+}
+
 def compare_to_normative_data(
     memory_score: float,
     age_group: str,
@@ -302,16 +318,8 @@ def compare_to_normative_data(
         Dictionary with percentile and interpretation
     """
     # Default normative data if none provided
-    # Based on simplified approximation of population distribution
-    # In a real implementation, this would come from empirical studies
     if normative_data is None:
-        normative_data = {
-            "5-7": {"mean": 65, "std": 12},
-            "8-10": {"mean": 70, "std": 12},
-            "11-13": {"mean": 75, "std": 12},
-            "14-16": {"mean": 78, "std": 12},
-            "adult": {"mean": 80, "std": 12}
-        }
+        normative_data = _DEFAULT_MEMORY_NORMS
     
     # Get normative values for age group
     norm = normative_data.get(age_group, {"mean": 75, "std": 12})
@@ -321,7 +329,7 @@ def compare_to_normative_data(
     
     # Convert to percentile
     # Using error function approximation for normal distribution CDF
-    percentile = round(100 * (0.5 * (1 + math.erf(z_score / math.sqrt(2)))), 1)
+    percentile = round(z_to_percentile(z_score), 1)
     
     # Determine classification
     if percentile >= 98:
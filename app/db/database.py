@@ -3,20 +3,54 @@ from sqlmodel import SQLModel, Session, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.utils.settings import settings
+from app.utils.age_utils import create_age_group_function
+from app.utils.time_scale_utils import create_daily_score_views, create_session_scores_view
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from contextlib import asynccontextmanager
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 # Create async engine
-engine = create_async_engine(settings.database_url, echo=True, future=True , pool_pre_ping=True)
+engine = create_async_engine(
+    settings.database_url,
+    echo=True,
+    future=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    # LIFO hands out the most recently used connection, so surplus ones sit
+    # idle long enough for pool_recycle to retire them after a burst.
+    pool_use_lifo=settings.db_pool_use_lifo,
+    pool_pre_ping=True,
+    pool_recycle=settings.db_pool_recycle,
+    connect_args={
+        # Auth and analytics lookups repeat the same handful of statements;
+        # keep their asyncpg prepared statements around per connection.
+        "prepared_statement_cache_size": 256,
+        # Probe idle pooled connections so a dropped NAT/firewall mapping is
+        # noticed by the server instead of leaving a half-open socket.
+        "server_settings": {
+            "tcp_keepalives_idle": "30",
+            "tcp_keepalives_interval": "10",
+        },
+    },
+)
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# For work that outlives the request (BackgroundTasks, queue jobs). Sessions
+# from get_session are closed as soon as the response has been sent.
+background_sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
 
 async def init_db():
     async with engine.begin() as conn:
+        # Indexes added to existing tables are built by app.db.migrations.
         await conn.run_sync(SQLModel.metadata.create_all)
+        await create_age_group_function(conn)
+        await create_session_scores_view(conn)
+        await create_daily_score_views(conn)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
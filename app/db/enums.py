@@ -9,3 +9,9 @@ class GameType(str, Enum):
     go_no_go = "go_no_go"
     sequence_memory = "sequence_memory"
     matching_cards = "matching_cards"
+
+class CognitiveDomain(str, Enum):
+    attention = "attention"
+    memory = "memory"
+    impulse_control = "impulse_control"
+    executive_function = "executive_function"
@@ -0,0 +1,124 @@
+"""
+One-off schema and data migrations for databases created before a change.
+
+Run once per deploy, before starting the new API and worker processes:
+
+    python -m app.db.migrations
+
+Every step is idempotent, so re-running is harmless. Index changes use
+CREATE/DROP INDEX CONCURRENTLY, which doesn't block writes on populated
+tables but can't run inside a transaction, and would have every process
+racing on the same DDL if it ran at start-up; hence this script rather than
+init_db. TimescaleDB rejects CONCURRENTLY on hypertables, so their indexes
+are built one chunk per transaction instead.
+"""
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import SQLModel
+
+from app.db import models  # noqa: F401  (registers the tables on SQLModel.metadata)
+from app.db.database import engine
+from app.utils.logger import logger
+from app.utils.time_scale_utils import create_daily_score_views, hypertable_names, refresh_daily_score_views
+
+# Indexes replaced by a wider one under a new name in models.py.
+SUPERSEDED_INDEXES = (
+    "ix_attention_analysis_session_created",
+    "ix_executive_function_analysis_session_created",
+    "ix_sessions_user_date",
+)
+
+
+def _model_indexes():
+    return [index for table in SQLModel.metadata.sorted_tables for index in table.indexes]
+
+
+async def _drop_index(conn: AsyncConnection, name: str, hypertables: set) -> None:
+    result = await conn.execute(
+        text("SELECT tablename FROM pg_indexes WHERE indexname = :name"), {"name": name}
+    )
+    table = result.scalar_one_or_none()
+    if table is None:
+        return
+    concurrently = "" if table in hypertables else " CONCURRENTLY"
+    await conn.execute(text(f"DROP INDEX{concurrently} IF EXISTS {name}"))
+
+
+def _create_indexes(sync_conn, hypertables: set) -> None:
+    # create_all only builds indexes along with new tables; pick up indexes
+    # added to the models after their tables already exist.
+    for index in _model_indexes():
+        if index.table.name in hypertables:
+            # Each chunk is indexed and committed on its own, so writes are
+            # only held up for one chunk at a time.
+            index.dialect_options["postgresql"]["with"] = {"timescaledb.transaction_per_chunk": "true"}
+        else:
+            index.dialect_options["postgresql"]["concurrently"] = True
+        index.create(sync_conn, checkfirst=True)
+
+
+async def migrate_indexes(conn: AsyncConnection) -> None:
+    """Build missing model indexes and drop the ones they superseded."""
+    hypertables = await hypertable_names(conn)
+
+    # An interrupted build leaves an invalid index behind that checkfirst
+    # would take for a finished one; drop it and build again.
+    result = await conn.execute(
+        text("""
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE NOT i.indisvalid AND c.relname = ANY(:names)
+        """),
+        {"names": [index.name for index in _model_indexes()]},
+    )
+    for name in result.scalars().all():
+        await _drop_index(conn, name, hypertables)
+
+    await conn.run_sync(_create_indexes, hypertables)
+
+    # Only once the replacements are in place, so reads never lose an index.
+    for name in SUPERSEDED_INDEXES:
+        await _drop_index(conn, name, hypertables)
+
+
+async def hash_invitation_tokens(conn: AsyncConnection) -> None:
+    """Replace raw invitation tokens with the SHA-256 digest accept_invitation looks up."""
+    # Raw tokens are 43 URL-safe base64 characters, so they never look like
+    # a 64-character hex digest; already hashed rows are left alone.
+    result = await conn.execute(text("""
+        UPDATE invitation_tokens
+        SET token = encode(sha256(convert_to(token, 'UTF8')), 'hex')
+        WHERE token !~ '^[0-9a-f]{64}$'
+    """))
+    logger.info(f"Hashed {result.rowcount} invitation tokens")
+
+
+async def backfill_daily_score_views(conn: AsyncConnection) -> None:
+    """Create the daily score aggregates if needed and materialise their history."""
+    await create_daily_score_views(conn)
+    await refresh_daily_score_views(conn)
+
+
+# Cheap data fixes first, so outstanding invitations keep working even if a
+# long index build fails and has to be re-run.
+MIGRATIONS = (
+    hash_invitation_tokens,
+    migrate_indexes,
+    backfill_daily_score_views,
+)
+
+
+async def main():
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for migration in MIGRATIONS:
+            logger.info(f"Running migration {migration.__name__}")
+            await migration(conn)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,7 +4,7 @@ from typing import Dict, List, Literal, Optional
 from uuid import UUID, uuid4
 from pydantic import EmailStr, root_validator
 from sqlmodel import  Float, SQLModel, Field, Relationship, text
-from sqlalchemy import Column, Integer, PrimaryKeyConstraint, String, Date, TIMESTAMP, Text, JSON, Enum
+from sqlalchemy import Column, Index, Integer, PrimaryKeyConstraint, String, Date, TIMESTAMP, Text, JSON, Enum
 from sqlalchemy.sql import func
 from sqlalchemy import Enum as SQLAlchemyEnum
 from enum import Enum
@@ -109,6 +109,11 @@ class Patient(SQLModel, table=True):
     
 class Session(SQLModel, table=True):
     __tablename__ = 'sessions'
+    __table_args__ = (
+        # Ordered by date, then id, so per-user history reads need no sort
+        # step and cursor pages can seek straight to (session_date, session_id).
+        Index("ix_sessions_user_date_id", "user_id", "session_date", "session_id"),
+    )
     
     session_id: UUID = Field( default_factory=uuid4,primary_key=True,sa_column_kwargs={"server_default": text("gen_random_uuid()")})  
     session_date: datetime = Field(sa_column=Column(TIMESTAMP, nullable=False))
@@ -213,6 +218,16 @@ class AttentionAnalysis(SQLModel, table=True):
     __tablename__ = "attention_analysis"
     __table_args__ = (
         PrimaryKeyConstraint("analysis_id", "created_at"),
+        # Covers every column /component-details reads, so the latest
+        # analysis for a session is an index-only scan.
+        Index(
+            "ix_attention_analysis_session_latest",
+            "session_id", text("created_at DESC"),
+            postgresql_include=[
+                "overall_score", "percentile", "classification",
+                "go_nogo_score", "sequence_score",
+            ],
+        ),
         {"extend_existing": True}
     )
 
@@ -235,6 +250,11 @@ class MemoryAnalysis(SQLModel, table=True):
     __tablename__ = "memory_analysis"
     __table_args__ = (
         PrimaryKeyConstraint("analysis_id", "created_at"),
+        Index(
+            "ix_memory_analysis_session_created",
+            "session_id", text("created_at DESC"),
+            postgresql_include=["overall_memory_score"],
+        ),
         {"extend_existing": True}
     )
 
@@ -262,6 +282,11 @@ class ImpulseAnalysis(SQLModel, table=True):
     __tablename__ = "impulse_analysis"
     __table_args__ = (
         PrimaryKeyConstraint("analysis_id", "created_at"),
+        Index(
+            "ix_impulse_analysis_session_created",
+            "session_id", text("created_at DESC"),
+            postgresql_include=["overall_impulse_control_score"],
+        ),
         {"extend_existing": True}
     )
 
@@ -287,6 +312,17 @@ class ExecutiveFunctionAnalysis(SQLModel, table=True):
     __tablename__ = "executive_function_analysis"
     __table_args__ = (
         PrimaryKeyConstraint("analysis_id", "created_at"),
+        # Covers every column /component-details reads, so the latest
+        # analysis for a session is an index-only scan.
+        Index(
+            "ix_executive_function_analysis_session_latest",
+            "session_id", text("created_at DESC"),
+            postgresql_include=[
+                "executive_function_score", "percentile", "classification",
+                "memory_contribution", "impulse_contribution",
+                "attention_contribution", "profile_pattern",
+            ],
+        ),
         {"extend_existing": True}
     )
 
@@ -311,7 +347,7 @@ class ExecutiveFunctionAnalysis(SQLModel, table=True):
 class InvitationToken(SQLModel, table=True):
     __tablename__ = "invitation_tokens"
 
-    token: str = Field(primary_key=True)  # Unique token for the invitation
+    token: str = Field(primary_key=True)  # SHA-256 hex digest of the invitation token
     clinician_id: UUID = Field(foreign_key="clinicians.user_id", nullable=False)  # Clinician who sent the invitation
     patient_email: Optional[str] = Field(sa_column=Column(String(100), nullable=True))  # Email of the invited patient
     expires_at: datetime = Field(sa_column=Column(TIMESTAMP, nullable=False))  # Expiration time of the token
@@ -322,6 +358,9 @@ class InvitationToken(SQLModel, table=True):
 
 class NormativeData(SQLModel, table=True):
     __tablename__ = "normative_data"
+    __table_args__ = (
+        Index("ix_normative_data_domain_age_group_clinical_group", "domain", "age_group", "clinical_group"),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True, sa_column_kwargs={"server_default": text("gen_random_uuid()")})
     domain: str  # "memory", "impulse_control", "executive_function", "attention"
@@ -1,5 +1,6 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.api.routes import analytics, auth, patient ,session ,mini_games, game_results
 from app.db.database import init_db, close_db_connection
 from app.db.models import Patient, Clinician, Session, GameResult  
@@ -17,6 +18,7 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title="ADHD Therapy Platform API",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.include_router(auth.router)
@@ -33,6 +35,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 # Root endpoint
 @app.get("/", tags=["Root"])
@@ -12,8 +12,9 @@ from app.db.models import (
     MemoryAnalysis, ImpulseAnalysis, ExecutiveFunctionAnalysis, 
     AttentionAnalysis, NormativeData, Session, Patient, GameResult
 )
-from app.utils.age_utils import get_age_group
+from app.utils.age_utils import get_age_and_group
 from app.utils.query_builder import QueryBuilder
+from app.utils.stats_utils import z_to_percentile
 from app.utils.domain_validation import get_domain_info, DOMAIN_MAP
 from app.utils.cache import cached, user_profile_cache_key, timeseries_cache_key, progress_cache_key
 
@@ -56,22 +57,18 @@ class CognitiveRepository:
         
         # Get all domain scores using the query builder
         scores_query, scores_params = QueryBuilder.build_domain_scores_query(user_id=user_id)
+        # An ungrouped aggregate always returns one row, and every average is
+        # COALESCEd to 0 in SQL.
         scores_result = await self.db.execute(text(scores_query), scores_params)
-        scores_data = scores_result.first()
+        scores_data = scores_result.one()
         
         # Get trend data using the query builder
         trend_query, trend_params = QueryBuilder.build_trend_query(user_id=user_id)
         trend_result = await self.db.execute(text(trend_query), trend_params)
-        trend_data = trend_result.fetchall()
+        trend_data = trend_result.all()
         
         # Calculate age and age group
-        today = datetime.utcnow().date()
-        age = (
-            today.year
-            - patient_data.date_of_birth.year
-            - ((today.month, today.day) < (patient_data.date_of_birth.month, patient_data.date_of_birth.day))
-        )
-        age_group = get_age_group(age)
+        age, age_group = get_age_and_group(patient_data.date_of_birth)
         
         # Construct the profile response
         profile = {
@@ -80,25 +77,25 @@ class CognitiveRepository:
             "age": age,
             "age_group": age_group,
             "gender": patient_data.gender,
-            "total_sessions": scores_data.total_sessions if scores_data else 0,
-            "first_session_date": scores_data.first_session_date if scores_data else None,
-            "last_session_date": scores_data.last_session_date if scores_data else None,
+            "total_sessions": scores_data.total_sessions,
+            "first_session_date": scores_data.first_session_date,
+            "last_session_date": scores_data.last_session_date,
             "adhd_subtype": patient_data.adhd_subtype,
             "avg_domain_scores": {
-                "memory": float(scores_data.avg_memory_score) if scores_data else 0.0,
-                "attention": float(scores_data.avg_attention_score) if scores_data else 0.0,
-                "impulse_control": float(scores_data.avg_impulse_score) if scores_data else 0.0,
-                "executive_function": float(scores_data.avg_executive_score) if scores_data else 0.0,
+                "memory": scores_data.avg_memory_score,
+                "attention": scores_data.avg_attention_score,
+                "impulse_control": scores_data.avg_impulse_score,
+                "executive_function": scores_data.avg_executive_score,
             },
             "trend_graph": [
                 {
-                    "session_date": row.session_date,
-                    "attention_score": float(row.attention_score),
-                    "memory_score": float(row.memory_score),
-                    "impulse_score": float(row.impulse_score),
-                    "executive_score": float(row.executive_score),
+                    "session_date": session_date,
+                    "attention_score": float(attention),
+                    "memory_score": float(memory),
+                    "impulse_score": float(impulse),
+                    "executive_score": float(executive),
                 }
-                for row in trend_data
+                for session_date, memory, attention, impulse, executive in trend_data
             ],
         }
         
@@ -144,9 +141,7 @@ class CognitiveRepository:
         )
 
         result = await self.db.execute(text(query), params)
-        data = result.fetchall()
-        
-        return [{"date": row.time_bucket, "score": float(row.avg_score)} for row in data]
+        return [{"date": bucket, "score": float(score)} for bucket, score in result]
     
     @cached(expire=600, key_builder=progress_cache_key)
     async def get_cognitive_progress(
@@ -185,21 +180,21 @@ class CognitiveRepository:
         )
         
         result = await self.db.execute(text(query), params)
-        data = result.fetchone()
-        
-        if not data:
+        # The aggregate always yields a row; an empty window leaves it all NULL.
+        data = result.mappings().one()
+        if data["initial_score"] is None:
             return None
         
         return {
             "user_id": user_id,
             "domain": domain,
             "period": period,
-            "initial_score": float(data.initial_score),
-            "current_score": float(data.current_score),
-            "initial_date": data.initial_date,
-            "current_date": data.current_date,
-            "absolute_change": float(data.absolute_change),
-            "percentage_change": float(data.percentage_change)
+            "initial_score": float(data["initial_score"]),
+            "current_score": float(data["current_score"]),
+            "initial_date": data["initial_date"],
+            "current_date": data["current_date"],
+            "absolute_change": float(data["absolute_change"]),
+            "percentage_change": float(data["percentage_change"])
         }
     
     @cached(expire=600)
@@ -297,88 +292,30 @@ class CognitiveRepository:
         """
         # Get domain info using the domain validation utility
         domain_info = get_domain_info(domain)
-        table = domain_info["table"]
-        column = domain_info["column"]
-        
-        # Get patient info for age group
-        patient_result = await self.db.execute(
-            select(Patient)
-            .where(Patient.user_id == user_id)
-        )
-        patient = patient_result.scalar_one_or_none()
         
-        if not patient:
-            return None
-        
-        # Calculate age and age group
-        today = datetime.utcnow().date()
-        age = (
-            today.year
-            - patient.date_of_birth.year
-            - ((today.month, today.day) < (patient.date_of_birth.month, patient.date_of_birth.day))
-        )
-        
-        age_group = get_age_group(age)
-        
-        # Get latest score with optimized query
-        query = f"""
-            SELECT 
-                {column} AS score,
-                created_at
-            FROM 
-                {table}
-            WHERE 
-                session_id IN (SELECT session_id FROM sessions WHERE user_id = :user_id)
-            ORDER BY 
-                created_at DESC
-            LIMIT 1
-        """
-        
-        result = await self.db.execute(text(query), {"user_id": str(user_id)})
-        user_data = result.fetchone()
+        # Patient age group, latest score and both normative bands in one round trip
+        query, params = QueryBuilder.build_normative_comparison_query(user_id, domain, domain_info)
+        result = await self.db.execute(text(query), params)
+        row = result.mappings().one_or_none()
         
-        if not user_data:
+        # No patient, no score yet, or no normative band for the age group
+        if not row or row["score"] is None or row["n_mean"] is None:
             return None
         
-        user_score = float(user_data.score)
-        
-        # Get normative data
-        norm_result = await self.db.execute(
-            select(NormativeData)
-            .where(
-                NormativeData.domain == domain,
-                NormativeData.age_group == age_group,
-                NormativeData.clinical_group == None
-            )
-        )
-        norm_data = norm_result.scalar_one_or_none()
-        
-        if not norm_data:
-            return None
+        age_group = row["age_group"]
+        user_score = float(row["score"])
         
         # Calculate z-score and percentile
-        import math
-        z_score = (user_score - norm_data.mean_score) / norm_data.standard_deviation
-        percentile = 100 * (0.5 * (1 + math.erf(z_score / math.sqrt(2))))
-        
-        # Get ADHD comparison data if available
-        adhd_result = await self.db.execute(
-            select(NormativeData)
-            .where(
-                NormativeData.domain == domain,
-                NormativeData.age_group == age_group,
-                NormativeData.clinical_group == "ADHD"
-            )
-        )
-        adhd_data = adhd_result.scalar_one_or_none()
+        z_score = (user_score - row["n_mean"]) / row["n_sd"]
+        percentile = z_to_percentile(z_score)
         
         adhd_comparison = None
-        if adhd_data:
-            adhd_z_score = (user_score - adhd_data.mean_score) / adhd_data.standard_deviation
-            adhd_percentile = 100 * (0.5 * (1 + math.erf(adhd_z_score / math.sqrt(2))))
+        if row["a_mean"] is not None:
+            adhd_z_score = (user_score - row["a_mean"]) / row["a_sd"]
+            adhd_percentile = z_to_percentile(adhd_z_score)
             adhd_comparison = {
-                "mean_score": float(adhd_data.mean_score),
-                "standard_deviation": float(adhd_data.standard_deviation),
+                "mean_score": float(row["a_mean"]),
+                "standard_deviation": float(row["a_sd"]),
                 "z_score": float(adhd_z_score),
                 "percentile": float(adhd_percentile)
             }
@@ -389,12 +326,12 @@ class CognitiveRepository:
             "user_score": user_score,
             "age_group": age_group,
             "normative_comparison": {
-                "mean_score": float(norm_data.mean_score),
-                "standard_deviation": float(norm_data.standard_deviation),
+                "mean_score": float(row["n_mean"]),
+                "standard_deviation": float(row["n_sd"]),
                 "z_score": float(z_score),
                 "percentile": float(percentile),
-                "sample_size": norm_data.sample_size,
-                "reliability": float(norm_data.reliability)
+                "sample_size": row["n_size"],
+                "reliability": float(row["n_reliability"])
             },
             "adhd_comparison": adhd_comparison
         }
@@ -585,77 +522,30 @@ class CognitiveRepository:
         for domain in domains:
             # Get domain info
             domain_info = get_domain_info(domain)
-            table = domain_info["table"]
-            column = domain_info["column"]
             
-            # Build query parameters
-            query_params = {"user_id": str(user_id)}
-            
-            # Build query based on comparison period
-            if interval:
-                query = f"""
-                WITH measurements AS (
-                    SELECT 
-                        {column} AS score,
-                        created_at,
-                        ROW_NUMBER() OVER (ORDER BY created_at ASC) AS rn_asc,
-                        ROW_NUMBER() OVER (ORDER BY created_at DESC) AS rn_desc
-                    FROM 
-                        {table}
-                    WHERE 
-                        session_id IN (SELECT session_id FROM sessions WHERE user_id = :user_id)
-                        AND created_at >= NOW() - INTERVAL '{interval}'
-                )
-                """
-            else:
-                query = f"""
-                WITH measurements AS (
-                    SELECT 
-                        {column} AS score,
-                        created_at,
-                        ROW_NUMBER() OVER (ORDER BY created_at ASC) AS rn_asc,
-                        ROW_NUMBER() OVER (ORDER BY created_at DESC) AS rn_desc
-                    FROM 
-                        {table}
-                    WHERE 
-                        session_id IN (SELECT session_id FROM sessions WHERE user_id = :user_id)
-                )
-                """
-            
-            # Complete the query
-            query += """
-            SELECT 
-                first.score AS initial_score,
-                last.score AS current_score,
-                first.created_at AS initial_date,
-                last.created_at AS current_date,
-                (last.score - first.score) AS absolute_change,
-                CASE 
-                    WHEN first.score = 0 THEN 0
-                    ELSE ((last.score - first.score) / first.score) * 100 
-                END AS percentage_change
-            FROM 
-                (SELECT score, created_at FROM measurements WHERE rn_asc = 1) first,
-                (SELECT score, created_at FROM measurements WHERE rn_desc = 1) last
-            """
+            query, query_params = QueryBuilder.build_progress_query(
+                user_id=user_id,
+                domain_info=domain_info,
+                interval=interval
+            )
             
             # Execute query
             result = await self.db.execute(text(query), query_params)
-            data = result.fetchone()
+            data = result.mappings().one()
             
-            if data and data.initial_score is not None and data.current_score is not None:
+            if data["initial_score"] is not None and data["current_score"] is not None:
                 domain_data[domain] = {
-                    "initial_score": float(data.initial_score),
-                    "current_score": float(data.current_score),
-                    "initial_date": data.initial_date,
-                    "current_date": data.current_date,
-                    "absolute_change": float(data.absolute_change),
-                    "percentage_change": float(data.percentage_change)
+                    "initial_score": float(data["initial_score"]),
+                    "current_score": float(data["current_score"]),
+                    "initial_date": data["initial_date"],
+                    "current_date": data["current_date"],
+                    "absolute_change": float(data["absolute_change"]),
+                    "percentage_change": float(data["percentage_change"])
                 }
                 
                 # Add to overall improvement calculation
-                if data.initial_score > 0:
-                    overall_improvement += float(data.percentage_change)
+                if data["initial_score"] > 0:
+                    overall_improvement += float(data["percentage_change"])
                     valid_domains += 1
         
         # Calculate average improvement
@@ -664,17 +554,17 @@ class CognitiveRepository:
         # Get trend data for visualization
         trend_query, trend_params = QueryBuilder.build_trend_query(user_id=user_id)
         trend_result = await self.db.execute(text(trend_query), trend_params)
-        trend_data = trend_result.fetchall()
+        trend_data = trend_result.all()
         
         trend_graph = [
             {
-                "session_date": row.session_date,
-                "attention_score": float(row.attention_score),
-                "memory_score": float(row.memory_score),
-                "impulse_score": float(row.impulse_score),
-                "executive_score": float(row.executive_score),
+                "session_date": session_date,
+                "attention_score": float(attention),
+                "memory_score": float(memory),
+                "impulse_score": float(impulse),
+                "executive_score": float(executive),
             }
-            for row in trend_data
+            for session_date, memory, attention, impulse, executive in trend_data
         ]
         
         return {
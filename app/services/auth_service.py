@@ -1,4 +1,5 @@
 # app/services/auth_service.py
+import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Union
 from fastapi.security import OAuth2PasswordBearer
@@ -68,11 +69,14 @@ class AuthService:
             
            
 
+            # bcrypt is deliberately slow; hash off the event loop.
+            hashed_password = await asyncio.to_thread(get_password_hash, profile_data.password)
+
             # Create user with hashed password
             user = User(
                 email=profile_data.email,
                 username=profile_data.username,
-                hashed_password=get_password_hash(profile_data.password),
+                hashed_password=hashed_password,
                 role = role,
                 is_active=True
             )
@@ -102,7 +106,11 @@ class AuthService:
     async def authenticate_user(self, email: str, password: str) -> Tuple[Union[User, Patient, Clinician, None], Optional[str]]:
         result = await self.session.execute(select(User).where(User.email == email))
         user = result.scalars().first()
-        if not user or not verify_password(password, user.hashed_password):
+        if not user:
+            return None, None
+        # bcrypt takes tens of milliseconds by design, so verify in a worker
+        # thread rather than stalling every other request on the loop.
+        if not await asyncio.to_thread(verify_password, password, user.hashed_password):
             return None, None
 
         # if user.role == Patient_role:
@@ -1,23 +1,72 @@
 # cognitive_assessment_service.py
 
-import statistics
-from typing import Dict, List, Optional, Union, Tuple
-import math
+import asyncio
+from typing import Dict, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
-import json
+from sqlalchemy import select
 from datetime import datetime
 from sqlalchemy.orm import selectinload
-from app.calculation.attention import compute_gonogo_attention_score, compute_overall_attention_score, compute_sequence_attention_score, get_attention_normative_comparison
+from cachetools import TTLCache
+from redis.exceptions import RedisError
+from app.calculation.attention import compute_gonogo_attention_score, compute_overall_attention_score, compute_sequence_attention_score
 from app.calculation.impulse import compute_impulse_control_score
 from app.calculation.memory import compute_memory_score
-from app.db.models import AttentionAnalysis
 from app.db.models import (
-    GameResult, SequenceMemoryMetrics, MatchingCardsMetrics,
-    MemoryAnalysis, ImpulseAnalysis, ExecutiveFunctionAnalysis, NormativeData
+    AttentionAnalysis, GameResult, MemoryAnalysis, ImpulseAnalysis,
+    ExecutiveFunctionAnalysis, NormativeData
 )
-from app.utils.age_utils import get_age_group
+from app.db.database import background_sessionmaker
+from app.utils.age_utils import get_age_and_group
+from app.utils.cache import get_redis
+from app.utils.stats_utils import z_to_percentile
+
+# Normative bands are reference data that only change when the seed is
+# re-run, so keep (mean, standard deviation) per band in-process. Missing
+# bands are cached too, as _NO_NORM. Entries are keyed by the version in
+# NORMS_VERSION_KEY, which clear_normative_cache bumps in Redis, so an edit
+# reaches every API and worker process on its next lookup. Without Redis,
+# a process keeps its bands until the TTL runs out.
+_norm_cache = TTLCache(maxsize=512, ttl=3600)
+_NO_NORM = object()
+NORMS_VERSION_KEY = "norms:version"
+
+async def _norms_version() -> Optional[str]:
+    try:
+        cache = await get_redis()
+        return await cache.get(NORMS_VERSION_KEY)
+    except (RedisError, OSError):
+        return None
+
+async def _fetch_norm(db: AsyncSession, domain: str, age_group: Optional[str]) -> Optional[Tuple[float, float]]:
+    key = (await _norms_version(), domain, age_group)
+    norm = _norm_cache.get(key, _NO_NORM)
+    if norm is _NO_NORM:
+        result = await db.execute(
+            select(NormativeData.mean_score, NormativeData.standard_deviation)
+            .where(
+                NormativeData.domain == domain,
+                NormativeData.age_group == age_group
+            )
+        )
+        row = result.one_or_none()
+        norm = (float(row.mean_score), float(row.standard_deviation)) if row else None
+        _norm_cache[key] = norm
+    return norm
+
+async def clear_normative_cache() -> None:
+    """
+    Drop cached normative bands in every process; call after editing
+    normative_data. Raises RedisError if the new version can't be published.
+    """
+    _norm_cache.clear()
+    cache = await get_redis()
+    await cache.incr(NORMS_VERSION_KEY)
+
+async def run_cognitive_assessment(session_id: UUID, date_of_birth: Optional[datetime]) -> None:
+    """Score a session on its own database session, outside any request."""
+    async with background_sessionmaker() as db:
+        await CognitiveAssessmentService(db).calculate_and_save_cognitive_assessment(session_id, date_of_birth)
 
 class CognitiveAssessmentService:
     def __init__(self, db: AsyncSession):
@@ -28,13 +77,7 @@ class CognitiveAssessmentService:
         try:
             age_group = None
             if date_of_birth:
-                today = datetime.utcnow().date()
-                age = (
-                    today.year
-                    - date_of_birth.year
-                    - ((today.month, today.day) < (date_of_birth.month, date_of_birth.day))
-                )
-                age_group = get_age_group(age)
+                _, age_group = get_age_and_group(date_of_birth)
             result = await self.db.execute(
                 select(GameResult)
                 .where(GameResult.session_id == session_id)
@@ -77,59 +120,12 @@ class CognitiveAssessmentService:
                         "time_per_match": game_result.matching_metrics.time_per_match
                     }
             
-            memory_result = compute_memory_score(
-                sequence_length=sequence_metrics.get("sequence_length", 0),
-                commission_errors=sequence_metrics.get("commission_errors", 0),
-                num_of_trials=sequence_metrics.get("num_of_trials", 0),
-                retention_times=sequence_metrics.get("retention_times", []),
-                total_sequence_elements=sequence_metrics.get("total_sequence_elements", 0),
-                
-                correct_matches=matching_metrics.get("correct_matches", 0),
-                incorrect_matches=matching_metrics.get("incorrect_matches", 0),
-                matches_attempted=matching_metrics.get("matches_attempted", 0),
-                time_per_match=matching_metrics.get("time_per_match", []),
-                
-                age_group=age_group
-            )
-
-            go_nogo_score = compute_gonogo_attention_score(
-                commission_errors=go_no_go_metrics.get("commission_errors", 0),
-                omission_errors=go_no_go_metrics.get("omission_errors", 0),
-                correct_go_responses=go_no_go_metrics.get("correct_go_responses", 0),
-                correct_nogo_responses=go_no_go_metrics.get("correct_nogo_responses", 0),
-                average_reaction_time_ms=go_no_go_metrics.get("average_reaction_time_ms", 0),
-                reaction_time_variability_ms=go_no_go_metrics.get("reaction_time_variability_ms", 0),
-                age_group=age_group
-                ) if go_no_go_metrics else 0
-
-            sequence_score = compute_sequence_attention_score(
-                sequence_length=sequence_metrics.get("sequence_length", 0),
-                expected_max_sequence=sequence_metrics.get("total_sequence_elements", 0),
-                commission_errors=sequence_metrics.get("commission_errors", 0),
-                total_sequence_elements=sequence_metrics.get("total_sequence_elements", 0),
-                retention_times=sequence_metrics.get("retention_times", []),
-                age_group=age_group
-            ) if sequence_metrics else 0
-
-            overall_attention_score = compute_overall_attention_score(go_nogo_score, sequence_score)
-            
-            impulse_result = compute_impulse_control_score(
-                commission_errors=sequence_metrics.get("commission_errors", 0),
-                total_sequence_elements=sequence_metrics.get("total_sequence_elements", 0),
-                retention_times=sequence_metrics.get("retention_times", []),
-                gonogo_commission_errors=go_no_go_metrics.get("commission_errors", 0),
-                correct_nogo_responses=go_no_go_metrics.get("correct_nogo_responses", 0),
-                average_reaction_time_ms=go_no_go_metrics.get("average_reaction_time_ms", 0),
-                incorrect_matches=matching_metrics.get("incorrect_matches", 0),
-                matches_attempted=matching_metrics.get("matches_attempted", 0),
-                time_per_match=matching_metrics.get("time_per_match", []),
-                age_group=age_group
-            )
-                        
-            executive_result = self.compute_executive_function_score(
-                memory_score=memory_result["overall_memory_score"],
-                impulse_score=impulse_result["overall_impulse_control_score"],
-                attention_score=overall_attention_score
+            # The scoring maths is pure CPU; keep it off the event loop, which
+            # is shared with other jobs in the worker and with requests when
+            # scoring falls back to a BackgroundTask.
+            (memory_result, go_nogo_score, sequence_score, overall_attention_score,
+             impulse_result, executive_result) = await asyncio.to_thread(
+                self._score_session, sequence_metrics, go_no_go_metrics, matching_metrics, age_group
             )
 
             attention_comparison = await self.compare_to_normative_data(
@@ -220,6 +216,66 @@ class CognitiveAssessmentService:
             await self.db.rollback()
             raise e
       
+    def _score_session(self, sequence_metrics: Dict, go_no_go_metrics: Dict, matching_metrics: Dict, age_group: Optional[str]):
+        """Run the scoring kernels over one session's metrics (synchronous, CPU only)."""
+        memory_result = compute_memory_score(
+            sequence_length=sequence_metrics.get("sequence_length", 0),
+            commission_errors=sequence_metrics.get("commission_errors", 0),
+            num_of_trials=sequence_metrics.get("num_of_trials", 0),
+            retention_times=sequence_metrics.get("retention_times", []),
+            total_sequence_elements=sequence_metrics.get("total_sequence_elements", 0),
+            
+            correct_matches=matching_metrics.get("correct_matches", 0),
+            incorrect_matches=matching_metrics.get("incorrect_matches", 0),
+            matches_attempted=matching_metrics.get("matches_attempted", 0),
+            time_per_match=matching_metrics.get("time_per_match", []),
+            
+            age_group=age_group
+        )
+
+        go_nogo_score = compute_gonogo_attention_score(
+            commission_errors=go_no_go_metrics.get("commission_errors", 0),
+            omission_errors=go_no_go_metrics.get("omission_errors", 0),
+            correct_go_responses=go_no_go_metrics.get("correct_go_responses", 0),
+            correct_nogo_responses=go_no_go_metrics.get("correct_nogo_responses", 0),
+            average_reaction_time_ms=go_no_go_metrics.get("average_reaction_time_ms", 0),
+            reaction_time_variability_ms=go_no_go_metrics.get("reaction_time_variability_ms", 0),
+            age_group=age_group
+            ) if go_no_go_metrics else 0
+
+        sequence_score = compute_sequence_attention_score(
+            sequence_length=sequence_metrics.get("sequence_length", 0),
+            expected_max_sequence=sequence_metrics.get("total_sequence_elements", 0),
+            commission_errors=sequence_metrics.get("commission_errors", 0),
+            total_sequence_elements=sequence_metrics.get("total_sequence_elements", 0),
+            retention_times=sequence_metrics.get("retention_times", []),
+            age_group=age_group
+        ) if sequence_metrics else 0
+
+        overall_attention_score = compute_overall_attention_score(go_nogo_score, sequence_score)
+        
+        impulse_result = compute_impulse_control_score(
+            commission_errors=sequence_metrics.get("commission_errors", 0),
+            total_sequence_elements=sequence_metrics.get("total_sequence_elements", 0),
+            retention_times=sequence_metrics.get("retention_times", []),
+            gonogo_commission_errors=go_no_go_metrics.get("commission_errors", 0),
+            correct_nogo_responses=go_no_go_metrics.get("correct_nogo_responses", 0),
+            average_reaction_time_ms=go_no_go_metrics.get("average_reaction_time_ms", 0),
+            incorrect_matches=matching_metrics.get("incorrect_matches", 0),
+            matches_attempted=matching_metrics.get("matches_attempted", 0),
+            time_per_match=matching_metrics.get("time_per_match", []),
+            age_group=age_group
+        )
+                    
+        executive_result = self.compute_executive_function_score(
+            memory_score=memory_result["overall_memory_score"],
+            impulse_score=impulse_result["overall_impulse_control_score"],
+            attention_score=overall_attention_score
+        )
+
+        return (memory_result, go_nogo_score, sequence_score, overall_attention_score,
+                impulse_result, executive_result)
+
     #  resourses :Diamond, A. (2013). Executive functions. Annual Review of Psychology, 64(1), 135–168. https://doi.org/10.1146/annurev-psych-113011-143750
     def compute_executive_function_score(self, memory_score=None, impulse_score=None, attention_score=None):
         """
@@ -295,15 +351,7 @@ class CognitiveAssessmentService:
     
     async def compare_to_normative_data(self, score, domain, age_group):
         """Compare score to normative data."""
-        # Query normative data
-        result = await self.db.execute(
-            select(NormativeData)
-            .where(
-                NormativeData.domain == domain,
-                NormativeData.age_group == age_group
-            )
-        )
-        norm_data = result.scalar_one_or_none()
+        norm_data = await _fetch_norm(self.db, domain, age_group)
         
         # Use default values if no normative data found
         if not norm_data:
@@ -320,14 +368,13 @@ class CognitiveAssessmentService:
                 mean = 70
                 std = 15
         else:
-            mean = norm_data.mean_score
-            std = norm_data.standard_deviation
+            mean, std = norm_data
         
         # Calculate z-score
         z_score = (score - mean) / std if std > 0 else 0
         
         # Calculate percentile
-        percentile = 100 * (0.5 * (1 + math.erf(z_score / math.sqrt(2))))
+        percentile = z_to_percentile(z_score)
         
         # Determine classification
         if percentile >= 98:
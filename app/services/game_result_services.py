@@ -2,6 +2,7 @@
 from datetime import datetime, timezone
 from typing import List, Optional
 from fastapi import HTTPException ,status
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
@@ -16,7 +17,9 @@ class GameResultService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_game_result(self, game_result_data: GameResultCreate , session_id : UUID) -> GameResultResponse:
+    @staticmethod
+    def game_result_values(game_result_data: GameResultCreate, session_id: UUID) -> dict:
+        """Column values for a new game_results row, with naive UTC times."""
         # Convert start_time and end_time to timezone-naive
         start_time = game_result_data.start_time
         if start_time.tzinfo is not None:
@@ -26,31 +29,30 @@ class GameResultService:
         if end_time and end_time.tzinfo is not None:
             end_time = end_time.astimezone(timezone.utc).replace(tzinfo=None)
 
-        new_game_result = GameResult(
-            session_id=session_id,
-            game_type=game_result_data.game_type,
-            start_time=start_time,
-            end_time=end_time,
-            difficulty_level=game_result_data.difficulty_level,
-        )
-
-        self.db.add(new_game_result)
-        await self.db.commit()
-        await self.db.refresh(new_game_result)
+        return {
+            "session_id": session_id,
+            "game_type": game_result_data.game_type,
+            "start_time": start_time,
+            "end_time": end_time,
+            "difficulty_level": game_result_data.difficulty_level,
+        }
 
-        # Eagerly load relationships
+    async def create_game_result(self, game_result_data: GameResultCreate , session_id : UUID) -> GameResultResponse:
+        # A single INSERT ... RETURNING: a freshly created result has no
+        # metrics yet, so there is nothing to refresh or eager-load.
         result = await self.db.execute(
-            select(GameResult)
-            .where(GameResult.result_id == new_game_result.result_id)
-            .options(
-                selectinload(GameResult.go_no_go_metrics),
-                selectinload(GameResult.sequence_metrics),
-                selectinload(GameResult.matching_metrics),
-            )
+            insert(GameResult)
+            .values(**self.game_result_values(game_result_data, session_id))
+            .returning(GameResult.result_id, GameResult.created_at, GameResult.game_type)
         )
-        new_game_result = result.scalar_one()
+        new_game_result = result.one()
+        await self.db.commit()
 
-        return GameResultResponse.from_orm(new_game_result)
+        return GameResultResponse(
+            result_id=new_game_result.result_id,
+            created_at=new_game_result.created_at,
+            game_type=new_game_result.game_type,
+        )
     async def get_game_results_by_user_id(self, user_id: UUID) -> List[GameResultResponse]:
         result = await self.db.execute(
             select(GameResult)
@@ -6,9 +6,16 @@ from uuid import UUID
 
 from sqlmodel import select
 
-from app.db.models import  GameResult, GoNoGoMetrics, MatchingCardsMetrics, SequenceMemoryMetrics, Session
+from app.db.models import  GameResult, GoNoGoMetrics, MatchingCardsMetrics, Patient, SequenceMemoryMetrics, Session
 from app.schemas.mini_games_schema import GoNoGoMetricCreate, GONoGoMetricsResponse, MatchingCardsMetricCreate, MatchingCardsMetricsResponse, SequenceMemoryMetricCreate, SequenceMemoryMetricsResponse
 
+# Metric tables by the type names used in the /metrics routes.
+METRIC_MODELS_BY_TYPE = {
+    "go_no_go": GoNoGoMetrics,
+    "sequence": SequenceMemoryMetrics,
+    "matching": MatchingCardsMetrics,
+}
+
 class MiniGameService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -40,35 +47,44 @@ class MiniGameService:
 
         
     async def get_metrics_by_type(self, metric_type: str, result_id: UUID):
-            print(f"inside the get query")
-
-            if metric_type == "go_no_go":
-                query = select(GoNoGoMetrics).where(GoNoGoMetrics.result_id == result_id)
-            elif metric_type == "sequence":
-                query = select(SequenceMemoryMetrics).where(SequenceMemoryMetrics.result_id == result_id)
-            elif metric_type == "matching":
-                query = select(MatchingCardsMetrics).where(MatchingCardsMetrics.result_id == result_id)
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Unsupported metric type: {metric_type}"
-                )
-            print(f" before Executing query: {query}")
+        metric_model = METRIC_MODELS_BY_TYPE.get(metric_type)
+        if metric_model is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported metric type: {metric_type}"
+            )
 
-            result = await self.db.execute(query)
-            return result.scalars().all()
+        result = await self.db.execute(select(metric_model).where(metric_model.result_id == result_id))
+        return result.scalars().all()
 
+    async def get_metrics_with_owner(self, metric_type: str, result_id: UUID):
+        """
+        Fetch a game result's metrics along with the patient and clinician it
+        belongs to, in a single round trip.
 
-    async def get_game_result_by_id(self, result_id: UUID) -> GameResult:
-        result = await self.db.execute(
-            select(GameResult).where(GameResult.result_id == result_id)
-        )
-        return result.scalar_one_or_none()
+        Returns (metrics, user_id, clinician_id), or None if there is no such
+        game result.
+        """
+        metric_model = METRIC_MODELS_BY_TYPE.get(metric_type)
+        if metric_model is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported metric type: {metric_type}"
+            )
 
-    async def get_session_by_id(self, session_id: UUID) -> Session:
+        # Outer join so a result with no metrics still yields its owner row.
         result = await self.db.execute(
-            select(Session).where(Session.session_id == session_id)
+            select(metric_model, Session.user_id, Patient.clinician_id)
+            .select_from(GameResult)
+            .join(Session, Session.session_id == GameResult.session_id)
+            .join(Patient, Patient.user_id == Session.user_id)
+            .outerjoin(metric_model, metric_model.result_id == GameResult.result_id)
+            .where(GameResult.result_id == result_id)
         )
-        return result.scalar_one_or_none()
+        rows = result.all()
+        if not rows:
+            return None
 
-    
\ No newline at end of file
+        metrics = [metric for metric, _, _ in rows if metric is not None]
+        _, user_id, clinician_id = rows[0]
+        return metrics, user_id, clinician_id
@@ -1,19 +1,63 @@
 from datetime import datetime, timezone
-from uuid import UUID
+from uuid import UUID, uuid4
 from fastapi import HTTPException
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import selectinload
+from pydantic import TypeAdapter
+from sqlalchemy.orm import load_only, selectinload
 
 from app.db.models import GameResult, Patient, Session
-from app.schemas.sessions_schema import GameResultResponse, SessionCreate, SessionCreateResponse, SessionResponse
+from app.schemas.sessions_schema import SessionCreate, SessionCreateResponse, SessionResponse
 
 
+from sqlalchemy import func, insert, tuple_
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.game_result_services import GameResultService
 from app.services.mini_games_services import MiniGameService
 
+# Eager loads for SessionResponse: each session's game results, restricted to
+# the columns GameResultResponse reads (plus the FK that ties them to their
+# session), and their metrics.
+SESSION_RESULTS_LOAD = selectinload(Session.game_results).options(
+    load_only(GameResult.result_id, GameResult.session_id, GameResult.created_at, GameResult.game_type),
+    selectinload(GameResult.go_no_go_metrics),
+    selectinload(GameResult.sequence_metrics),
+    selectinload(GameResult.matching_metrics),
+)
+
+# Validates (and, in routes, serialises) a page of sessions with their
+# nested game results in one pydantic-core call.
+SESSION_LIST_ADAPTER = TypeAdapter(list[SessionResponse])
+
+# Below this many rows a multi-row INSERT is as quick as COPY.
+COPY_MIN_ROWS = 50
+
+
+async def _insert_rows(db: AsyncSession, model, rows: list[dict]) -> None:
+    """Insert rows into model's table, over the COPY protocol for large batches."""
+    if len(rows) < COPY_MIN_ROWS:
+        await db.execute(insert(model), rows)
+        return
+
+    # COPY bypasses SQLAlchemy's parameter handling, so run each column's
+    # bind processor (enum names, JSON text) the way an INSERT would.
+    connection = await db.connection()
+    table = model.__table__
+    columns = list(rows[0])
+    processors = [table.c[name].type.bind_processor(connection.dialect) for name in columns]
+    records = [
+        tuple(
+            row[name] if process is None else process(row[name])
+            for name, process in zip(columns, processors)
+        )
+        for row in rows
+    ]
+
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(table.name, records=records, columns=columns)
+
+
 class SessionService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -24,23 +68,12 @@ class SessionService:
         if session_date.tzinfo:
             session_date = session_date.astimezone(timezone.utc).replace(tzinfo=None)
 
-        new_session = Session(
-            session_date=session_date,
-            session_duration=session_data.session_duration,
-            notes=session_data.notes,
-            user_id=user_id,
-        )
-
-        self.db.add(new_session)
-        await self.db.commit()
-        await self.db.refresh(new_session)
-
+        # Ids are generated here so the game results and their metrics can be
+        # linked up front and written with one multi-row INSERT per table.
+        game_result_rows = []
+        metric_rows = {}
+        session_id = uuid4()
         for result in session_data.game_results:
-            result_obj = await self.game_result_service.create_game_result(
-                game_result_data=result,
-                session_id=new_session.session_id,
-            )
-
             match result.game_type:
                 case "go_no_go":
                     metrics = result.go_no_go_metrics
@@ -54,93 +87,88 @@ class SessionService:
             if not metrics:
                 raise HTTPException(status_code=400, detail="Missing metrics for the game result")
 
-            metric_data = metrics.dict() if hasattr(metrics, "dict") else metrics
-            metric_data["result_id"] = result_obj.result_id
-
-            await self.mini_game_service.create_metric(result.game_type, metric_data)
-
-        result = await self.db.execute(
-            select(Session)
-            .where(Session.session_id == new_session.session_id)
-            .options(
-                selectinload(Session.game_results).selectinload(GameResult.go_no_go_metrics),
-                selectinload(Session.game_results).selectinload(GameResult.sequence_metrics),
-                selectinload(Session.game_results).selectinload(GameResult.matching_metrics),
+            result_id = uuid4()
+            game_result_rows.append({
+                "result_id": result_id,
+                **GameResultService.game_result_values(result, session_id),
+            })
+
+            metric_data = metrics.dict() if hasattr(metrics, "dict") else dict(metrics)
+            metric_data["result_id"] = result_id
+            metric_rows.setdefault(result.game_type, []).append(metric_data)
+
+        created = await self.db.execute(
+            insert(Session)
+            .values(
+                session_id=session_id,
+                session_date=session_date,
+                session_duration=session_data.session_duration,
+                notes=session_data.notes,
+                user_id=user_id,
             )
+            .returning(Session.created_at)
         )
-        new_session = result.scalar_one()
-        new_session.created_at = new_session.created_at or datetime.utcnow()
+        created_at = created.scalar_one()
+
+        if game_result_rows:
+            await _insert_rows(self.db, GameResult, game_result_rows)
+        for game_type, rows in metric_rows.items():
+            _, metric_model = self.mini_game_service.metric_model_map[game_type]
+            await _insert_rows(self.db, metric_model, rows)
+
+        await self.db.commit()
+
         return SessionCreateResponse(
-                session_id=new_session.session_id,
-                session_date=new_session.session_date,
-                created_at=new_session.created_at,
+                session_id=session_id,
+                session_date=session_date,
+                created_at=created_at or datetime.utcnow(),
             )
     
-    async def get_sessions_by_patient_id(self, patient_id: UUID, limit: int, offset: int) -> list[SessionResponse]:
+    async def get_sessions_by_patient_id(self, patient_id: UUID, limit: int, offset: int) -> tuple[list[SessionResponse], int]:
+        """Return one page of a patient's sessions, newest first, and the total session count."""
+        # COUNT(*) OVER () rides along with the page, so the total comes from
+        # the same snapshot and the same round trip as the rows.
         result = await self.db.execute(
-            select(Session)
+            select(Session, func.count().over().label("total"))
             .where(Session.user_id == patient_id)
-            .options(
-                selectinload(Session.game_results).selectinload(GameResult.go_no_go_metrics),
-                selectinload(Session.game_results).selectinload(GameResult.sequence_metrics),
-                selectinload(Session.game_results).selectinload(GameResult.matching_metrics),
-            )
+            .options(SESSION_RESULTS_LOAD)
+            .order_by(Session.session_date.desc(), Session.session_id.desc())
             .limit(limit)
             .offset(offset)
         )
-        sessions = result.scalars().all()
-
-        session_responses = []
-        for session in sessions:
-            session_dict = session.dict()
-            session_dict["game_results"] = [
-                GameResultResponse.from_orm(game_result) for game_result in session.game_results
-            ]
-            session_responses.append(SessionResponse(**session_dict))
+        rows = result.all()
+
+        if rows:
+            total = rows[0].total
+        elif offset:
+            # Paged past the end: no row to carry the window count.
+            total = (await self.db.execute(
+                select(func.count()).select_from(Session).where(Session.user_id == patient_id)
+            )).scalar_one()
+        else:
+            total = 0
+
+        session_responses = SESSION_LIST_ADAPTER.validate_python(
+            [session for session, _ in rows], from_attributes=True
+        )
 
-        return session_responses
+        return session_responses, total
 
-    async def get_sessions_by_patient_id(self, patient_id: UUID , limit :int , offset:int) -> list[SessionResponse]:
-        result = await self.db.execute(
+    async def get_sessions_after(
+        self, patient_id: UUID, limit: int, after: tuple[datetime, UUID] | None = None
+    ) -> list[SessionResponse]:
+        """Return the page of a patient's sessions that follows the (session_date, session_id) cursor, newest first."""
+        stmt = (
             select(Session)
             .where(Session.user_id == patient_id)
-            .options(
-                selectinload(Session.game_results).selectinload(GameResult.go_no_go_metrics),
-                selectinload(Session.game_results).selectinload(GameResult.sequence_metrics),
-                selectinload(Session.game_results).selectinload(GameResult.matching_metrics),
-            ).limit(limit).offset(offset)
-        )
-        sessions = result.scalars().all()
-
-        # Convert game_results to GameResultResponse
-        session_responses = []
-        for session in sessions:
-            session_dict = session.dict()
-            session_dict["game_results"] = [
-                GameResultResponse.from_orm(game_result) for game_result in session.game_results
-            ]
-            session_responses.append(SessionResponse(**session_dict))
-
-        return session_responses
-    async def get_sessions_by_patient_id(self, patient_id: UUID , limit :int , offset:int) -> list[SessionResponse]:
-        result = await self.db.execute(
-            select(Session)
-            .where(Session.user_id == patient_id)
-            .options(
-                selectinload(Session.game_results).selectinload(GameResult.go_no_go_metrics),
-                selectinload(Session.game_results).selectinload(GameResult.sequence_metrics),
-                selectinload(Session.game_results).selectinload(GameResult.matching_metrics),
-            ).limit(limit).offset(offset)
+            .options(SESSION_RESULTS_LOAD)
+            .order_by(Session.session_date.desc(), Session.session_id.desc())
+            .limit(limit)
         )
-        sessions = result.scalars().all()
-
-        # Convert game_results to GameResultResponse
-        session_responses = []
-        for session in sessions:
-            session_dict = session.dict()
-            session_dict["game_results"] = [
-                GameResultResponse.from_orm(game_result) for game_result in session.game_results
-            ]
-            session_responses.append(SessionResponse(**session_dict))
-
-        return session_responses
\ No newline at end of file
+        if after is not None:
+            # Seek past the cursor on ix_sessions_user_date_id instead of
+            # reading and discarding every earlier page as OFFSET does.
+            stmt = stmt.where(tuple_(Session.session_date, Session.session_id) < tuple_(*after))
+
+        sessions = (await self.db.execute(stmt)).scalars().all()
+        return SESSION_LIST_ADAPTER.validate_python(sessions, from_attributes=True)
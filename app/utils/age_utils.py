@@ -1,3 +1,10 @@
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+
+
 def get_age_group(age: int) -> str:
     """
     Convert numeric age to a predefined age group label.
@@ -17,4 +24,57 @@ def get_age_group(age: int) -> str:
     elif 14 <= age <= 16:
         return "14-16"
     else:
-        return "adult"
\ No newline at end of file
+        return "adult"
+
+# SQL twin of get_age_group, so queries can join normative_data on the age
+# group without a Python round trip. Keep the two in step.
+AGE_GROUP_FUNCTION = "age_group_of"
+
+async def create_age_group_function(db):
+    """
+    Create or replace the age_group_of(age) SQL function.
+
+    Args:
+        db: AsyncSession or AsyncConnection - Database handle
+    """
+    await db.execute(text(f"""
+    CREATE OR REPLACE FUNCTION {AGE_GROUP_FUNCTION}(age integer) RETURNS text
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+        SELECT CASE
+            WHEN age BETWEEN 5 AND 7 THEN '5-7'
+            WHEN age BETWEEN 8 AND 10 THEN '8-10'
+            WHEN age BETWEEN 11 AND 13 THEN '11-13'
+            WHEN age BETWEEN 14 AND 16 THEN '14-16'
+            ELSE 'adult'
+        END
+    $$;
+    """))
+
+@lru_cache(maxsize=4096)
+def _age_on(date_of_birth: date, today_ordinal: int) -> Tuple[int, str]:
+    today = date.fromordinal(today_ordinal)
+    age = (
+        today.year
+        - date_of_birth.year
+        - ((today.month, today.day) < (date_of_birth.month, date_of_birth.day))
+    )
+    return age, get_age_group(age)
+
+
+def get_age_and_group(date_of_birth: date, today: Optional[date] = None) -> Tuple[int, str]:
+    """
+    Compute age in whole years and its age group label.
+
+    Results are memoised per (date of birth, day), since neither value can
+    change more than once a day.
+
+    Args:
+        date_of_birth: Date of birth
+        today: Reference date, defaults to the current UTC date
+
+    Returns:
+        Tuple of (age, age group label)
+    """
+    if today is None:
+        today = datetime.utcnow().date()
+    return _age_on(date_of_birth, today.toordinal())
@@ -11,22 +11,29 @@ import asyncio
 from fastapi import Request, Response, Depends
 from redis import asyncio as aioredis
 
+from app.utils.settings import settings
+
 # Type variable for generic function return type
 T = TypeVar('T')
 
 # Redis client instance
 redis: Optional[aioredis.Redis] = None
 
-async def init_redis_pool(redis_url: str = "redis://localhost:6379/0"):
+async def init_redis_pool(redis_url: Optional[str] = None):
     """
     Initialize Redis connection pool.
     
     Args:
-        redis_url: Redis connection URL
+        redis_url: Redis connection URL (defaults to settings.redis_url)
     """
     global redis
     if redis is None:
-        redis = await aioredis.from_url(redis_url, decode_responses=True)
+        redis = await aioredis.from_url(
+            redis_url or settings.redis_url,
+            decode_responses=True,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_connect_timeout,
+        )
     return redis
 
 async def get_redis() -> aioredis.Redis:
@@ -4,6 +4,8 @@ SQL query builder utilities for cognitive data access.
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 from uuid import UUID
+from app.utils.age_utils import AGE_GROUP_FUNCTION
+from app.utils.time_scale_utils import daily_score_views_ready
 
 class QueryBuilder:
     """Base class for building SQL queries."""
@@ -64,10 +66,10 @@ class QueryBuilder:
         elif user_id:
             query = """
             SELECT 
-                COALESCE(AVG(ma.overall_memory_score), 0) AS avg_memory_score,
-                COALESCE(AVG(aa.overall_score), 0) AS avg_attention_score,
-                COALESCE(AVG(ia.overall_impulse_control_score), 0) AS avg_impulse_score,
-                COALESCE(AVG(ea.executive_function_score), 0) AS avg_executive_score,
+                COALESCE(AVG(ma.overall_memory_score), 0.0)::float8 AS avg_memory_score,
+                COALESCE(AVG(aa.overall_score), 0.0)::float8 AS avg_attention_score,
+                COALESCE(AVG(ia.overall_impulse_control_score), 0.0)::float8 AS avg_impulse_score,
+                COALESCE(AVG(ea.executive_function_score), 0.0)::float8 AS avg_executive_score,
                 COUNT(DISTINCT s.session_id) AS total_sessions,
                 MIN(s.session_date) AS first_session_date,
                 MAX(s.session_date) AS last_session_date
@@ -168,42 +170,48 @@ class QueryBuilder:
         column = domain_info["column"]
         agg_view = domain_info.get("agg_view")
         
+        params = {
+            "user_id": str(user_id),
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        
         # Try to use continuous aggregate view if available and interval matches
-        if agg_view and interval == "1 day":
+        if agg_view and interval == "1 day" and daily_score_views_ready():
             query = f"""
                 SELECT 
-                    bucket AS time_bucket,
-                    avg_score
+                    v.bucket AS time_bucket,
+                    v.score_sum / NULLIF(v.score_count, 0) AS avg_score
                 FROM 
-                    {agg_view}
+                    {agg_view} v
                 WHERE 
-                    session_id IN (SELECT session_id FROM sessions WHERE user_id = :user_id)
-                    AND bucket BETWEEN :start_date AND :end_date
+                    v.user_id = :user_id
+                    AND v.bucket BETWEEN time_bucket(INTERVAL '1 day', CAST(:start_date AS timestamptz)) AND :end_date
                 ORDER BY 
-                    bucket ASC
+                    v.bucket ASC
             """
         else:
             # Fall back to regular time bucket query
             query = f"""
                 SELECT 
-                    time_bucket('{interval}', created_at) AS time_bucket,
-                    AVG({column}) AS avg_score
+                    time_bucket(CAST(CAST(:interval AS text) AS interval), a.created_at) AS time_bucket,
+                    AVG(a.{column}) AS avg_score
                 FROM 
-                    {table}
+                    {table} a
+                    JOIN sessions s ON s.session_id = a.session_id
                 WHERE 
-                    session_id IN (SELECT session_id FROM sessions WHERE user_id = :user_id)
-                    AND created_at BETWEEN :start_date AND :end_date
+                    s.user_id = :user_id
+                    AND a.created_at BETWEEN :start_date AND :end_date
                 GROUP BY 
                     time_bucket
                 ORDER BY 
                     time_bucket ASC
             """
-        
-        params = {
-            "user_id": str(user_id),
-            "start_date": start_date,
-            "end_date": end_date,
-        }
+            # Bound rather than interpolated so every interval shares one
+            # statement text, and with it one prepared plan. The inner cast
+            # sends it as text: a bare CAST(:interval AS interval) makes
+            # asyncpg demand a timedelta and reject "1 day".
+            params["interval"] = interval
         
         return query, params
     
@@ -211,15 +219,19 @@ class QueryBuilder:
     def build_progress_query(
         user_id: UUID,
         domain_info: Dict[str, str],
-        interval: str
+        interval: Optional[str]
     ) -> Tuple[str, Dict[str, Any]]:
         """
         Build a query to get progress comparison data for a domain.
         
+        The first and latest measurements come from one aggregate over a
+        single scan. The query always returns one row; when there are no
+        measurements its scores are NULL.
+        
         Args:
             user_id: User ID to get progress for
             domain_info: Domain information (table, column)
-            interval: Time interval for comparison
+            interval: Time interval for comparison, or None for all time
             
         Returns:
             Tuple of (query string, query parameters)
@@ -227,34 +239,107 @@ class QueryBuilder:
         table = domain_info["table"]
         column = domain_info["column"]
         
+        params = {"user_id": str(user_id)}
+        window_filter = ""
+        if interval:
+            # Sent as text for Postgres to cast; see build_timeseries_query.
+            window_filter = "AND a.created_at >= NOW() - CAST(CAST(:interval AS text) AS interval)"
+            params["interval"] = interval
+        
         query = f"""
-        WITH measurements AS (
+        WITH window_scores AS (
             SELECT 
-                {column} AS score,
-                created_at,
-                ROW_NUMBER() OVER (ORDER BY created_at ASC) AS rn_asc,
-                ROW_NUMBER() OVER (ORDER BY created_at DESC) AS rn_desc
+                (array_agg(a.{column} ORDER BY a.created_at ASC))[1] AS initial_score,
+                (array_agg(a.{column} ORDER BY a.created_at DESC))[1] AS current_score,
+                MIN(a.created_at) AS initial_at,
+                MAX(a.created_at) AS current_at
             FROM 
-                {table}
+                {table} a
+                JOIN sessions s ON s.session_id = a.session_id
             WHERE 
-                session_id IN (SELECT session_id FROM sessions WHERE user_id = :user_id)
-                AND created_at >= NOW() - INTERVAL '{interval}'
+                s.user_id = :user_id
+                {window_filter}
         )
         SELECT 
-            first.score AS initial_score,
-            last.score AS current_score,
-            first.created_at AS initial_date,
-            last.created_at AS current_date,
-            (last.score - first.score) AS absolute_change,
+            initial_score,
+            current_score,
+            initial_at AS initial_date,
+            current_at AS current_date,
+            (current_score - initial_score) AS absolute_change,
             CASE 
-                WHEN first.score = 0 THEN 0
-                ELSE ((last.score - first.score) / first.score) * 100 
+                WHEN initial_score = 0 THEN 0
+                ELSE ((current_score - initial_score) / initial_score) * 100 
             END AS percentage_change
         FROM 
-            (SELECT score, created_at FROM measurements WHERE rn_asc = 1) first,
-            (SELECT score, created_at FROM measurements WHERE rn_desc = 1) last
+            window_scores
         """
         
-        params = {"user_id": str(user_id)}
+        return query, params
+    
+    @staticmethod
+    def build_normative_comparison_query(
+        user_id: UUID,
+        domain: str,
+        domain_info: Dict[str, str]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build a query for a user's latest domain score with both normative bands.
+        
+        The age group is derived in SQL by age_group_of, the SQL twin of
+        app.utils.age_utils.get_age_group.
+        
+        Args:
+            user_id: User ID to compare
+            domain: Cognitive domain
+            domain_info: Domain information (table, column)
+            
+        Returns:
+            Tuple of (query string, query parameters)
+        """
+        table = domain_info["table"]
+        column = domain_info["column"]
+        
+        query = f"""
+        WITH pat AS (
+            SELECT 
+                p.user_id,
+                p.adhd_subtype,
+                {AGE_GROUP_FUNCTION}(date_part('year', age(p.date_of_birth))::int) AS age_group
+            FROM 
+                patients p
+            WHERE 
+                p.user_id = :user_id
+        )
+        SELECT 
+            pat.age_group,
+            latest.score,
+            latest.created_at,
+            n.mean_score AS n_mean,
+            n.standard_deviation AS n_sd,
+            n.sample_size AS n_size,
+            n.reliability AS n_reliability,
+            adhd.mean_score AS a_mean,
+            adhd.standard_deviation AS a_sd
+        FROM 
+            pat
+        LEFT JOIN LATERAL (
+            SELECT a.{column} AS score, a.created_at
+            FROM {table} a
+            JOIN sessions s ON s.session_id = a.session_id
+            WHERE s.user_id = pat.user_id
+            ORDER BY a.created_at DESC
+            LIMIT 1
+        ) latest ON true
+        LEFT JOIN normative_data n 
+            ON n.domain = :domain 
+            AND n.age_group = pat.age_group 
+            AND n.clinical_group IS NULL
+        LEFT JOIN normative_data adhd 
+            ON adhd.domain = :domain 
+            AND adhd.age_group = pat.age_group 
+            AND adhd.clinical_group = 'ADHD'
+        """
+        
+        params = {"user_id": str(user_id), "domain": domain}
         
         return query, params
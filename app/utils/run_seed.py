@@ -5,11 +5,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.db.database import get_session
+from app.services.cognitive_assessment_service import clear_normative_cache
 from app.utils.seed_normative_data import seed_normative_data
 
 async def main():
     async for session in get_session():
         await seed_normative_data(session)
+    # Running processes would otherwise score against the old bands.
+    await clear_normative_cache()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
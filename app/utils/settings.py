@@ -11,6 +11,15 @@ class Settings(BaseSettings):
     secret_key: str = Field(..., env="SECRET_KEY")
     access_token_expire_minutes: int = Field(30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     database_url: str = Field(..., env="DATABASE_URL")
+    db_pool_size: int = Field(25, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(25, env="DB_MAX_OVERFLOW")
+    db_pool_recycle: int = Field(1800, env="DB_POOL_RECYCLE")
+    db_pool_use_lifo: bool = Field(True, env="DB_POOL_USE_LIFO")
+    redis_url: str = Field("redis://localhost:6379/0", env="REDIS_URL")
+    # Auth consults Redis on every request: fail over to the database fast
+    # rather than hang on an unresponsive server.
+    redis_socket_timeout: float = Field(0.5, env="REDIS_SOCKET_TIMEOUT")
+    redis_connect_timeout: float = Field(0.5, env="REDIS_CONNECT_TIMEOUT")
     algorithm: str = "HS256"
 
 
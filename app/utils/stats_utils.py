@@ -0,0 +1,49 @@
+from math import erfc, fsum, sqrt
+from typing import Sequence, Tuple
+
+_INV_SQRT2 = 1.0 / sqrt(2.0)
+
+# Normal CDF (as a percentile) sampled every 0.01 over z in [-6, 6]. Linear
+# interpolation between samples is accurate to well under the 0.1 callers
+# round to; beyond +/-6 the percentile is 0.0 or 100.0 anyway.
+_Z_MIN, _Z_MAX, _Z_STEPS_PER_UNIT = -6.0, 6.0, 100
+_PCT_TABLE = [
+    50.0 * erfc(-(_Z_MIN + i / _Z_STEPS_PER_UNIT) * _INV_SQRT2)
+    for i in range(int((_Z_MAX - _Z_MIN) * _Z_STEPS_PER_UNIT) + 1)
+]
+_PCT_LAST = len(_PCT_TABLE) - 1
+
+
+def z_to_percentile(z: float) -> float:
+    """
+    Convert a z-score to its percentile under the standard normal.
+
+    Args:
+        z: z-score
+
+    Returns:
+        Percentile in [0, 100]
+    """
+    pos = (min(max(z, _Z_MIN), _Z_MAX) - _Z_MIN) * _Z_STEPS_PER_UNIT
+    i = min(int(pos), _PCT_LAST - 1)
+    lo = _PCT_TABLE[i]
+    return lo + (_PCT_TABLE[i + 1] - lo) * (pos - i)
+
+
+def mean_stdev(values: Sequence[float]) -> Tuple[float, float]:
+    """
+    Mean and sample standard deviation of at least two values.
+
+    Plain float arithmetic: statistics.mean/stdev compute exactly with
+    Fractions, which is far slower and buys nothing once scores are rounded.
+
+    Args:
+        values: Sample values (len >= 2)
+
+    Returns:
+        (mean, sample standard deviation)
+    """
+    n = len(values)
+    mean = fsum(values) / n
+    variance = fsum((x - mean) ** 2 for x in values) / (n - 1)
+    return mean, sqrt(variance)
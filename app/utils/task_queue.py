@@ -0,0 +1,74 @@
+"""
+Job queue for work too heavy to run inside the API process.
+"""
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from arq import create_pool
+from arq.connections import ArqRedis, RedisSettings
+from redis.exceptions import RedisError
+
+from app.utils.logger import logger
+from app.utils.settings import settings
+
+# Same Redis instance app.utils.cache talks to. The worker keeps arq's
+# default connection retries: it should wait for Redis to come back.
+REDIS_SETTINGS = RedisSettings.from_dsn(settings.redis_url)
+
+# The API only enqueues, and has a fallback when Redis is away, so it
+# connects once with a short timeout instead of retrying for seconds.
+_ENQUEUE_REDIS_SETTINGS = replace(
+    REDIS_SETTINGS, conn_retries=0, conn_timeout=settings.redis_connect_timeout
+)
+
+# After a failed connect or enqueue, skip Redis for this many seconds so
+# uploads go straight to the fallback rather than each retrying it.
+POOL_RETRY_AFTER = 10.0
+
+# arq pool instance
+arq_pool: Optional[ArqRedis] = None
+_pool_retry_at = 0.0
+
+async def get_arq_pool() -> Optional[ArqRedis]:
+    """
+    Get the arq Redis pool, creating it on first use.
+    
+    Returns:
+        arq Redis pool, or None while Redis is known to be unreachable
+    """
+    global arq_pool, _pool_retry_at
+    if time.monotonic() < _pool_retry_at:
+        return None
+    if arq_pool is None:
+        try:
+            arq_pool = await create_pool(_ENQUEUE_REDIS_SETTINGS)
+        except (RedisError, OSError):
+            _pool_retry_at = time.monotonic() + POOL_RETRY_AFTER
+            raise
+    return arq_pool
+
+async def enqueue_cognitive_assessment(session_id: UUID, date_of_birth: Optional[datetime]) -> bool:
+    """
+    Queue cognitive scoring of a session for the arq worker (app.worker).
+    
+    Args:
+        session_id: Session to score
+        date_of_birth: Patient's date of birth, for the age group
+        
+    Returns:
+        True if the job was queued, False if Redis could not be reached
+    """
+    global _pool_retry_at
+    try:
+        pool = await get_arq_pool()
+        if pool is None:
+            return False
+        await pool.enqueue_job("analyze_session", session_id, date_of_birth)
+    except (RedisError, OSError) as e:
+        _pool_retry_at = time.monotonic() + POOL_RETRY_AFTER
+        logger.warning(f"Could not queue scoring for session {session_id}: {e}")
+        return False
+    return True
@@ -1,5 +1,6 @@
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.utils.domain_validation import DOMAIN_MAP
 
 async def create_hypertable(db: AsyncSession, table_name: str, time_column: str, chunk_time_interval: str = '7 days'):
     """
@@ -103,3 +104,136 @@ async def create_index(db: AsyncSession, table_name: str, column_name: str, inde
     """
     await db.execute(text(query))
     await db.commit()
+
+async def hypertable_names(db) -> set:
+    """
+    Names of the hypertables in the database; empty without TimescaleDB.
+
+    Args:
+        db: AsyncSession or AsyncConnection - Database handle
+    """
+    result = await db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')"
+    ))
+    if not result.scalar():
+        return set()
+    result = await db.execute(text(
+        "SELECT hypertable_name FROM timescaledb_information.hypertables"
+    ))
+    return set(result.scalars().all())
+
+SESSION_SCORES_VIEW = "cognitive_session_overall"
+
+async def create_session_scores_view(db):
+    """
+    Create the per-session domain score view behind the profile trend graph.
+
+    One row per session with each domain score (0 when missing) and their
+    mean. A plain view, so it is never stale: a filter on user_id is pushed
+    below the GROUP BY, and each domain joins through its (session_id,
+    created_at) index for just that user's sessions. Replaces the earlier
+    materialized view of the same name. Safe to run on every start-up.
+
+    Args:
+        db: AsyncSession or AsyncConnection - Database handle
+    """
+    await db.execute(text(f"""
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_matviews WHERE matviewname = '{SESSION_SCORES_VIEW}') THEN
+            DROP MATERIALIZED VIEW {SESSION_SCORES_VIEW};
+        END IF;
+    END
+    $$;
+    """))
+    await db.execute(text(f"""
+    CREATE OR REPLACE VIEW {SESSION_SCORES_VIEW} AS
+    SELECT
+        s.session_id,
+        s.user_id,
+        s.session_date,
+        COALESCE(AVG(ma.overall_memory_score), 0) AS memory_score,
+        COALESCE(AVG(aa.overall_score), 0) AS attention_score,
+        COALESCE(AVG(ia.overall_impulse_control_score), 0) AS impulse_score,
+        COALESCE(AVG(ea.executive_function_score), 0) AS executive_score,
+        (COALESCE(AVG(ma.overall_memory_score), 0)
+         + COALESCE(AVG(aa.overall_score), 0)
+         + COALESCE(AVG(ia.overall_impulse_control_score), 0)
+         + COALESCE(AVG(ea.executive_function_score), 0)) / 4.0 AS overall_score
+    FROM sessions s
+    LEFT JOIN memory_analysis ma ON s.session_id = ma.session_id
+    LEFT JOIN attention_analysis aa ON s.session_id = aa.session_id
+    LEFT JOIN impulse_analysis ia ON s.session_id = ia.session_id
+    LEFT JOIN executive_function_analysis ea ON s.session_id = ea.session_id
+    GROUP BY s.session_id, s.user_id, s.session_date;
+    """))
+
+# Per-user daily score sums and counts for each domain, as continuous
+# aggregates. Coarser buckets are rebuilt from them as SUM(sum) / SUM(count).
+DAILY_SCORE_VIEWS = {domain: info["agg_view"] for domain, info in DOMAIN_MAP.items()}
+
+_daily_score_views_ready = False
+
+def daily_score_views_ready() -> bool:
+    """Whether create_daily_score_views set up the aggregates in this process."""
+    return _daily_score_views_ready
+
+async def create_daily_score_views(db):
+    """
+    Create the daily score continuous aggregates named in DOMAIN_MAP.
+
+    Real-time aggregation is left on, so buckets newer than the last policy
+    run are computed from the raw rows. The policy only refreshes the last
+    few days, so history that predates the aggregates is materialised once
+    by refresh_daily_score_views. Skipped without TimescaleDB or when the
+    analysis tables are not hypertables. Safe to run on every start-up.
+
+    Args:
+        db: AsyncSession or AsyncConnection - Database handle
+    """
+    global _daily_score_views_ready
+    hypertables = await hypertable_names(db)
+    if not all(info["table"] in hypertables for info in DOMAIN_MAP.values()):
+        return
+
+    for info in DOMAIN_MAP.values():
+        view_name = info["agg_view"]
+        await db.execute(text(f"""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS {view_name}
+        WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+        SELECT
+            s.user_id,
+            time_bucket(INTERVAL '1 day', a.created_at) AS bucket,
+            SUM(a.{info["column"]}) AS score_sum,
+            COUNT(a.{info["column"]}) AS score_count
+        FROM {info["table"]} a
+        JOIN sessions s ON s.session_id = a.session_id
+        GROUP BY s.user_id, time_bucket(INTERVAL '1 day', a.created_at)
+        WITH NO DATA;
+        """))
+        await db.execute(text(f"""
+        SELECT add_continuous_aggregate_policy('{view_name}',
+            start_offset => INTERVAL '3 days',
+            end_offset => INTERVAL '1 hour',
+            schedule_interval => INTERVAL '1 hour',
+            if_not_exists => TRUE);
+        """))
+    _daily_score_views_ready = True
+
+async def refresh_daily_score_views(conn):
+    """
+    Materialise the daily score aggregates over their whole range.
+
+    They are created WITH NO DATA and their policy only looks back three
+    days, so without this, rows older than that at creation time would
+    never be materialised and would drop out once the watermark passes
+    them. Already materialised ranges are skipped, so re-running is cheap.
+    CALL refresh_continuous_aggregate can't run inside a transaction.
+
+    Args:
+        conn: AsyncConnection - Connection in AUTOCOMMIT mode
+    """
+    if not daily_score_views_ready():
+        return
+    for view_name in DAILY_SCORE_VIEWS.values():
+        await conn.execute(text(f"CALL refresh_continuous_aggregate('{view_name}', NULL, NULL);"))
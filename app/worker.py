@@ -0,0 +1,26 @@
+"""
+arq worker for cognitive scoring jobs.
+
+Run alongside the API with: arq app.worker.WorkerSettings
+"""
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from app.db.database import close_db_connection
+from app.services.cognitive_assessment_service import run_cognitive_assessment
+from app.utils.task_queue import REDIS_SETTINGS
+
+
+async def analyze_session(ctx, session_id: UUID, date_of_birth: Optional[datetime]) -> None:
+    await run_cognitive_assessment(session_id, date_of_birth)
+
+
+async def shutdown(ctx) -> None:
+    await close_db_connection()
+
+
+class WorkerSettings:
+    functions = [analyze_session]
+    redis_settings = REDIS_SETTINGS
+    on_shutdown = shutdown
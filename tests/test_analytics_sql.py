@@ -0,0 +1,118 @@
+"""
+Run the analytics route statements against a real Postgres.
+
+Needs TEST_DATABASE_URL (postgresql+asyncpg://...) pointing at a scratch
+database where the timescaledb extension is available; skipped otherwise.
+Each test works inside one transaction that is rolled back.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+if TEST_DATABASE_URL:
+    # app.utils.settings insists on these at import time.
+    os.environ.setdefault("DATABASE_URL", TEST_DATABASE_URL)
+    os.environ.setdefault("SECRET_KEY", "test")
+
+INTERVALS = ("1 hour", "1 day", "1 week", "1 month")
+
+
+def _in_rolled_back_transaction(check):
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import SQLModel
+
+    from app.db import models  # noqa: F401  (registers the tables)
+
+    async def main():
+        engine = create_async_engine(TEST_DATABASE_URL)
+        try:
+            async with engine.connect() as conn:
+                transaction = await conn.begin()
+                try:
+                    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS timescaledb"))
+                    await conn.run_sync(SQLModel.metadata.create_all)
+                    await check(conn)
+                finally:
+                    await transaction.rollback()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_daily_timeseries_binds_every_interval():
+    from sqlalchemy import text
+
+    from app.api.routes.analytics import DAILY_TIMESERIES_SQL
+    from app.utils.time_scale_utils import DAILY_SCORE_VIEWS
+
+    user_id = uuid4()
+    day = datetime(2025, 1, 15)
+
+    async def check(conn):
+        # Temporary tables shadow the continuous aggregates by name, so the
+        # statement runs whether or not they exist in this database.
+        for view in DAILY_SCORE_VIEWS.values():
+            await conn.execute(text(f"""
+                CREATE TEMP TABLE {view} (
+                    user_id uuid, bucket timestamp,
+                    score_sum double precision, score_count bigint
+                ) ON COMMIT DROP
+            """))
+            await conn.execute(
+                text(f"INSERT INTO {view} VALUES (:user_id, :bucket, 150, 2)"),
+                {"user_id": user_id, "bucket": day},
+            )
+
+        for domain, statement in DAILY_TIMESERIES_SQL.items():
+            for interval in INTERVALS:
+                result = await conn.execute(statement, {
+                    "user_id": user_id,
+                    "interval": interval,
+                    "start_date": day - timedelta(days=30),
+                    "end_date": day + timedelta(days=30),
+                })
+                rows = result.all()
+                assert len(rows) == 1, (domain, interval)
+                assert rows[0].avg_score == 75
+
+    _in_rolled_back_transaction(check)
+
+
+def test_raw_timeseries_binds_every_interval():
+    from app.api.routes.analytics import TIMESERIES_SQL
+
+    async def check(conn):
+        now = datetime.utcnow()
+        for domain, statement in TIMESERIES_SQL.items():
+            for interval in INTERVALS:
+                result = await conn.execute(statement, {
+                    "user_id": uuid4(),
+                    "interval": interval,
+                    "start_date": now - timedelta(days=90),
+                    "end_date": now,
+                })
+                assert result.all() == [], (domain, interval)
+
+    _in_rolled_back_transaction(check)
+
+
+def test_progress_binds_every_period():
+    from app.api.routes.analytics import PROGRESS_PERIODS, PROGRESS_SQL
+
+    async def check(conn):
+        for domain, statement in PROGRESS_SQL.items():
+            for interval in PROGRESS_PERIODS.values():
+                result = await conn.execute(statement, {"user_id": uuid4(), "interval": interval})
+                # An empty window still yields its one all-NULL row.
+                assert result.mappings().one()["initial_score"] is None, (domain, interval)
+
+    _in_rolled_back_transaction(check)